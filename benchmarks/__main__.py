@@ -0,0 +1,168 @@
+"""API latency benchmarks.
+
+    python -m benchmarks run --users 20 --items-per-user 2000 -o current.json
+    python -m benchmarks compare baseline.json current.json --threshold 0.2
+
+The database comes from the usual PG*/POSTGRES_* settings (.env). Use a
+dedicated database: every run adds its own generated users and items.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+
+def _run(args) -> int:
+    env = dict(os.environ)
+    if args.no_cache:
+        env["CACHE_BACKEND"] = "none"
+    # Budget warnings would flood the log under load.
+    env.setdefault("QUERY_BUDGET", "0")
+    os.environ.update(env)
+
+    # Imported late so the app settings see the environment above.
+    from benchmarks.dataset import seed_dataset
+    from src.database.generate import GenerateParams
+    from benchmarks.report import compare, report
+    from benchmarks.runner import migrate, run_scenarios, serve
+    from benchmarks.scenarios import SCENARIOS
+
+    names = args.scenarios or [
+        name for name, scenario in SCENARIOS.items()
+        if args.include_writes or not scenario.writes
+    ]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    if not args.skip_migrate:
+        migrate(env)
+    params = GenerateParams(
+        users=args.users,
+        items_per_user=args.items_per_user,
+        tags_per_user=args.tags_per_user,
+        tag_fanout=args.tag_fanout,
+        skew=args.skew,
+        seed=args.seed,
+    )
+    dataset = asyncio.run(seed_dataset(params))
+
+    with serve(env, args.workers) as base_url:
+        results = asyncio.run(run_scenarios(
+            base_url,
+            [SCENARIOS[name] for name in names],
+            dataset,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+        ))
+
+    result = report(
+        results,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        workers=args.workers,
+        cache=env.get("CACHE_BACKEND", "memory"),
+        dataset={
+            "users": params.users,
+            "items_per_user": params.items_per_user,
+            "tags_per_user": params.tags_per_user,
+            "tag_fanout": params.tag_fanout,
+            "skew": params.skew,
+            "seed": params.seed,
+        },
+    )
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return _report_regressions(compare(
+            baseline, result, args.threshold, args.metric, args.min_delta_ms
+        ))
+    return 0
+
+
+def _compare(args) -> int:
+    from benchmarks.report import compare
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return _report_regressions(compare(
+        baseline, current, args.threshold, args.metric, args.min_delta_ms
+    ))
+
+
+def _report_regressions(regressions: list[str]) -> int:
+    if not regressions:
+        print("No latency regressions", file=sys.stderr)
+        return 0
+    print("Latency regressions:", file=sys.stderr)
+    for line in regressions:
+        print(f"  {line}", file=sys.stderr)
+    return 1
+
+
+def _add_compare_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="allowed relative latency growth (default: 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--metric", choices=("p50", "p95", "p99", "mean"), default="p95",
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=1.0,
+        help="ignore regressions smaller than this in absolute terms",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="seed a dataset, start the app and measure")
+    run.add_argument("--users", type=int, default=10)
+    run.add_argument("--items-per-user", type=int, default=1000)
+    run.add_argument("--tags-per-user", type=int, default=20)
+    run.add_argument("--tag-fanout", type=float, default=1.5)
+    run.add_argument("--skew", type=float, default=1.0)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    run.add_argument("--warmup", type=float, default=2, help="seconds per scenario")
+    run.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    run.add_argument("--scenarios", nargs="+", help="default: all read scenarios")
+    run.add_argument("--include-writes", action="store_true")
+    run.add_argument("--no-cache", action="store_true", help="run with CACHE_BACKEND=none")
+    run.add_argument("--skip-migrate", action="store_true")
+    run.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    run.add_argument("--baseline", help="fail if latency regressed against this report")
+    _add_compare_options(run)
+    run.set_defaults(handler=_run)
+
+    cmp = commands.add_parser("compare", help="compare two saved reports")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    _add_compare_options(cmp)
+    cmp.set_defaults(handler=_compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+
+from src.database.connection import DatabaseConnection
+from src.database.generate import GenerateParams, run_generate
+from src.database.models import Items, Tags
+
+
+@dataclass
+class Dataset:
+    """Ids created for one benchmark run; scenarios only touch these."""
+
+    user_ids: list[int] = field(default_factory=list)
+    item_ids: dict[int, list[int]] = field(default_factory=dict)
+    tag_ids: dict[int, list[int]] = field(default_factory=dict)
+
+
+async def seed_dataset(params: GenerateParams) -> Dataset:
+    """Generate a fresh set of users, then load the ids scenarios pick from.
+
+    Generated users get a unique email prefix per run, so repeated runs
+    against the same database never collide and never touch unrelated data.
+    """
+    generated = await run_generate(params)
+    dataset = Dataset(user_ids=generated.user_ids)
+    async with DatabaseConnection.get_read_session() as session:
+        for model, ids in ((Items, dataset.item_ids), (Tags, dataset.tag_ids)):
+            result = await session.execute(
+                select(model.user_id, model.id)
+                .where(model.user_id.in_(dataset.user_ids))
+            )
+            for user_id, row_id in result:
+                ids.setdefault(user_id, []).append(row_id)
+    # Skewed generation can leave light users without items.
+    dataset.user_ids = [
+        user_id for user_id in dataset.user_ids if dataset.item_ids.get(user_id)
+    ]
+    for user_id in dataset.user_ids:
+        dataset.tag_ids.setdefault(user_id, [])
+    return dataset
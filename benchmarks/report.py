@@ -0,0 +1,88 @@
+"""Turning latency samples into reports, and comparing reports.
+
+Kept free of application imports so saved reports can be compared
+without a database or settings.
+"""
+import math
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 3),
+            "p95": round(percentile(ms, 95), 3),
+            "p99": round(percentile(ms, 99), 3),
+            "max": round(ms[-1], 3) if ms else 0.0,
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: dict, **meta) -> dict:
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            **meta,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float,
+    metric: str = "p95",
+    min_delta_ms: float = 1.0,
+) -> list[str]:
+    """Return one message per scenario whose latency regressed.
+
+    A scenario regresses when metric grew by more than threshold (a
+    fraction) and by more than min_delta_ms, which keeps sub-millisecond
+    noise from failing fast endpoints.
+    """
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        old = base["latency_ms"][metric]
+        new = result["latency_ms"][metric]
+        change = (new - old) / old if old else 0.0
+        line = f"{name:<24} {metric} {old:>8.2f}ms -> {new:>8.2f}ms ({change:+.1%})"
+        print(line, file=sys.stderr)
+        if change > threshold and new - old > min_delta_ms:
+            regressions.append(line)
+    return regressions
@@ -0,0 +1,143 @@
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import httpx
+
+from benchmarks.dataset import Dataset
+from benchmarks.report import ROOT, summarize
+from benchmarks.scenarios import Scenario
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    dataset: Dataset,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> dict:
+    """Run scenario with a fixed number of workers for duration seconds.
+
+    Every worker sends its next request as soon as the previous one
+    returns (closed loop), so throughput is bounded by latency.
+    """
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng: random.Random):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request = scenario.build(rng, dataset)
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method,
+                    request.url,
+                    params=request.params,
+                    json=request.json,
+                )
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(random.Random(seed * 1000 + n)) for n in range(concurrency)
+    ))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_scenarios(
+    base_url: str,
+    scenarios: list[Scenario],
+    dataset: Dataset,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30
+    ) as client:
+        for scenario in scenarios:
+            if warmup > 0:
+                await drive(client, scenario, dataset, concurrency, warmup, seed=1)
+            results[scenario.name] = await drive(
+                client, scenario, dataset, concurrency, duration
+            )
+            print(_format_line(scenario.name, results[scenario.name]), file=sys.stderr)
+    return results
+
+
+def _format_line(name: str, result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{name:<24} {result['throughput_rps']:>9.1f} rps  "
+        f"p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  "
+        f"p99 {latency['p99']:>8.2f}ms  errors {result['errors']}"
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def migrate(env: dict) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT, env=env, check=True,
+    )
+
+
+@contextmanager
+def serve(env: dict, workers: int = 1) -> Iterator[str]:
+    """Start the app under uvicorn in a subprocess and yield its base URL."""
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, process)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/swagger", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not start within {timeout}s")
@@ -0,0 +1,108 @@
+import random
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from benchmarks.dataset import Dataset
+from src.database.generate import WORDS
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random, Dataset], Request]
+    writes: bool = False
+
+
+def _user(rng: random.Random, dataset: Dataset) -> int:
+    return rng.choice(dataset.user_ids)
+
+
+def _item(rng: random.Random, dataset: Dataset) -> tuple[int, int]:
+    user_id = _user(rng, dataset)
+    return user_id, rng.choice(dataset.item_ids[user_id])
+
+
+def list_items(rng, dataset):
+    return Request("GET", "/items/", {"user_id": _user(rng, dataset)})
+
+
+def list_items_filtered(rng, dataset):
+    user_id = _user(rng, dataset)
+    params = {"user_id": user_id, "status": rng.choice(["planned", "reading", "done"])}
+    if dataset.tag_ids[user_id]:
+        params["tags_any"] = rng.choice(dataset.tag_ids[user_id])
+    return Request("GET", "/items/", params)
+
+
+def list_items_deep_page(rng, dataset):
+    user_id = _user(rng, dataset)
+    offset = max(len(dataset.item_ids[user_id]) - 50, 0)
+    return Request("GET", "/items/", {"user_id": user_id, "offset": offset})
+
+
+def get_item(rng, dataset):
+    user_id, item_id = _item(rng, dataset)
+    return Request("GET", f"/items/{item_id}", {"user_id": user_id})
+
+
+def search_items(rng, dataset):
+    return Request(
+        "GET",
+        "/items/search",
+        {"user_id": _user(rng, dataset), "q": rng.choice(WORDS)[:4]},
+    )
+
+
+def list_tags(rng, dataset):
+    return Request("GET", "/tags/", {"user_id": _user(rng, dataset)})
+
+
+def user_stats(rng, dataset):
+    return Request("GET", f"/users/{_user(rng, dataset)}/stats")
+
+
+def update_item(rng, dataset):
+    user_id, item_id = _item(rng, dataset)
+    tag_ids = dataset.tag_ids[user_id]
+    return Request(
+        "PATCH",
+        f"/items/{item_id}",
+        {"user_id": user_id},
+        {
+            "priority": rng.choice(["low", "normal", "high"]),
+            "tag_ids": rng.sample(tag_ids, min(len(tag_ids), 2)),
+        },
+    )
+
+
+def create_item(rng, dataset):
+    return Request(
+        "POST",
+        "/items/",
+        {"user_id": _user(rng, dataset)},
+        {"title": " ".join(rng.sample(WORDS, 3)), "kind": "article"},
+    )
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("list_items", list_items),
+        Scenario("list_items_filtered", list_items_filtered),
+        Scenario("list_items_deep_page", list_items_deep_page),
+        Scenario("get_item", get_item),
+        Scenario("search_items", search_items),
+        Scenario("list_tags", list_tags),
+        Scenario("user_stats", user_stats),
+        Scenario("update_item", update_item, writes=True),
+        Scenario("create_item", create_item, writes=True),
+    )
+}
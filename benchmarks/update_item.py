@@ -0,0 +1,125 @@
+"""Round-trips and latency of PATCH /items/{id}.
+
+    python -m benchmarks.update_item --requests 500 -o before.json
+    python -m benchmarks.update_item --requests 500 --baseline before.json
+
+Runs the app in-process and counts the SQL statements each PATCH issues
+(through the query stats middleware), alternating between field-only
+updates and tag changes. Uses the configured database and generates a
+small dataset for itself.
+
+To see what a change to the update path saves, save a report on the
+commit before it (copy this file there if it predates it) and pass it
+as --baseline on the current one.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+# (label, path in a case's results, unit)
+COMPARED = (
+    ("statements", ("statements_per_request",), ""),
+    ("db time", ("db_time_ms_per_request",), "ms"),
+    ("p50", ("latency_ms", "p50"), "ms"),
+)
+
+
+def _compare(baseline: dict, current: dict) -> None:
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        parts = []
+        for label, path, unit in COMPARED:
+            old, new = base, result
+            for key in path:
+                old, new = old[key], new[key]
+            parts.append(f"{label} {old:.2f}{unit} -> {new:.2f}{unit}")
+        print(f"{name:<16} " + ", ".join(parts), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--items-per-user", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument(
+        "--baseline", help="report of an earlier run to compare with",
+    )
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from benchmarks.dataset import seed_dataset
+    from benchmarks.report import report, summarize
+    from src.core.query_stats import capture_query_stats
+    from src.database.generate import GenerateParams
+    from src.main import app
+
+    params = GenerateParams(
+        users=1, items_per_user=args.items_per_user, tags_per_user=20,
+        skew=0, seed=args.seed,
+    )
+    rng = random.Random(args.seed)
+    cases = {
+        "fields": lambda: {"priority": rng.choice(["low", "normal", "high"])},
+        "fields_and_tags": lambda: {
+            "status": rng.choice(["planned", "reading", "done"]),
+            "tag_ids": rng.sample(tag_ids, rng.randint(0, 4)),
+        },
+    }
+    results = {}
+    with TestClient(app) as client:
+        # Seeded on the app's loop so the pooled connections stay usable.
+        dataset = client.portal.call(seed_dataset, params)
+        user_id = dataset.user_ids[0]
+        item_ids = dataset.item_ids[user_id]
+        tag_ids = dataset.tag_ids[user_id]
+        for name, payload in cases.items():
+            latencies = []
+            errors = 0
+            with capture_query_stats() as captured:
+                for _ in range(args.requests):
+                    started = time.perf_counter()
+                    response = client.patch(
+                        f"/items/{rng.choice(item_ids)}",
+                        params={"user_id": user_id},
+                        json=payload(),
+                    )
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            patches = [stats for stats in captured if stats.method == "PATCH"]
+            results[name] = {
+                **summarize(latencies, errors, sum(latencies)),
+                "statements_per_request": round(
+                    sum(stats.queries for stats in patches) / len(patches), 2
+                ),
+                "db_time_ms_per_request": round(
+                    sum(stats.db_time for stats in patches) / len(patches) * 1000, 3
+                ),
+            }
+    result = report(
+        results,
+        requests=args.requests,
+        items_per_user=args.items_per_user,
+        seed=args.seed,
+    )
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            _compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
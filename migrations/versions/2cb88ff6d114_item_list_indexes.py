@@ -0,0 +1,78 @@
+"""Item list indexes
+
+Revision ID: 2cb88ff6d114
+Revises: 52455b568158
+Create Date: 2026-10-18 10:12:41.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2cb88ff6d114'
+down_revision: Union[str, Sequence[str], None] = '52455b568158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) for the plain btree indexes backing list_items:
+# every listing filters on user_id and sorts on one column with id as the
+# keyset tiebreaker, so both directions are served by a single index scan.
+BTREE_INDEXES = [
+    ('ix_items_user_id_created_at', 'items', ['user_id', 'created_at', 'id']),
+    ('ix_items_user_id_updated_at', 'items', ['user_id', 'updated_at', 'id']),
+    ('ix_items_user_id_priority', 'items', ['user_id', 'priority', 'id']),
+    (
+        'ix_items_user_id_status_created_at',
+        'items',
+        ['user_id', 'status', 'created_at', 'id'],
+    ),
+    ('ix_item_tag_tag_id_item_id', 'item_tag', ['tag_id', 'item_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Build indexes without locking writes on existing libraries.
+    with op.get_context().autocommit_block():
+        for name, table, columns in BTREE_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            'ix_items_title_trgm',
+            'items',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_items_title_trgm',
+            table_name='items',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for name, table, _ in reversed(BTREE_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,43 @@
+"""User created_at index
+
+Revision ID: 4d81e6b0c2a7
+Revises: 9f3c1a7d2b64
+Create Date: 2026-10-18 16:41:37.920514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d81e6b0c2a7'
+down_revision: Union[str, Sequence[str], None] = '9f3c1a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Backs the created_at range filter of the user listing and export.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at',
+            'users',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_created_at',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
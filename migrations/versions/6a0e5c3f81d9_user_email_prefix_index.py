@@ -0,0 +1,45 @@
+"""User email prefix index
+
+Revision ID: 6a0e5c3f81d9
+Revises: 4d81e6b0c2a7
+Create Date: 2026-10-18 19:02:26.731845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a0e5c3f81d9'
+down_revision: Union[str, Sequence[str], None] = '4d81e6b0c2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The unique email index only serves LIKE 'prefix%' under the C
+    # collation; text_pattern_ops serves it under any collation.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_pattern',
+            'users',
+            ['email'],
+            unique=False,
+            postgresql_ops={'email': 'text_pattern_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_email_pattern',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,54 @@
+"""Item stats
+
+Revision ID: 72b71a003e30
+Revises: b22cc3038c3c
+Create Date: 2026-10-18 12:20:44.702911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '72b71a003e30'
+down_revision: Union[str, Sequence[str], None] = 'b22cc3038c3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('item_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('dimension', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'dimension', 'value')
+    )
+    # Backfill counters for existing libraries.
+    op.execute("""
+        INSERT INTO item_stats (user_id, dimension, value, count)
+        SELECT user_id, 'total', '', count(*)
+        FROM items GROUP BY user_id
+        UNION ALL
+        SELECT user_id, 'status', status::text, count(*)
+        FROM items GROUP BY user_id, status
+        UNION ALL
+        SELECT user_id, 'kind', kind::text, count(*)
+        FROM items GROUP BY user_id, kind
+        UNION ALL
+        SELECT user_id, 'priority', priority::text, count(*)
+        FROM items GROUP BY user_id, priority
+        UNION ALL
+        SELECT items.user_id, 'tag', item_tag.tag_id::text, count(*)
+        FROM item_tag JOIN items ON items.id = item_tag.item_id
+        GROUP BY items.user_id, item_tag.tag_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('item_stats')
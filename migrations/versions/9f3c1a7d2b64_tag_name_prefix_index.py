@@ -0,0 +1,43 @@
+"""Tag name prefix index
+
+Revision ID: 9f3c1a7d2b64
+Revises: 72b71a003e30
+Create Date: 2026-10-18 16:05:12.408133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3c1a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '72b71a003e30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tags_user_id_name_pattern',
+            'tags',
+            ['user_id', 'name'],
+            unique=False,
+            postgresql_ops={'name': 'text_pattern_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tags_user_id_name_pattern',
+            table_name='tags',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,58 @@
+"""Item full-text search
+
+Revision ID: b22cc3038c3c
+Revises: 2cb88ff6d114
+Create Date: 2026-10-18 11:02:17.093145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b22cc3038c3c'
+down_revision: Union[str, Sequence[str], None] = '2cb88ff6d114'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gin lets user_id live in the same GIN index as the tsvector,
+    # so a search only touches the posting lists of one user.
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.add_column('items', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A')"
+            " || setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_user_id_search_vector',
+            'items',
+            ['user_id', 'search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_items_user_id_search_vector',
+            table_name='items',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('items', 'search_vector')
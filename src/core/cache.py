@@ -0,0 +1,215 @@
+import enum
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from fastapi import Response
+
+from .settings import settings
+
+
+class CacheBackend:
+    """Byte cache plus version counters per scope (a user, a collection).
+
+    Cached entries are keyed by the current version of their scope, so
+    bumping the version after a write invalidates all of them at once.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def get_version(self, scope: str) -> str:
+        raise NotImplementedError
+
+    async def bump_version(self, scope: str) -> None:
+        raise NotImplementedError
+
+    async def pin(self, scope: str, seconds: float) -> None:
+        """Flag the scope for ``seconds``; reads of it then skip replicas."""
+        raise NotImplementedError
+
+    async def is_pinned(self, scope: str) -> bool:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU with per-entry TTL.
+
+    Versions live in the same process, so this backend is only coherent
+    with a single worker; use the shared backend for several workers.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._pinned_until: dict[str, float] = {}
+        # Distinguishes counters of this process from those of a previous
+        # one, so a restart never resurrects an old version string.
+        self._epoch = uuid.uuid4().hex[:8]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_version(self, scope: str) -> str:
+        return f"{self._epoch}.{self._versions.get(scope, 0)}"
+
+    async def bump_version(self, scope: str) -> None:
+        self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    async def pin(self, scope: str, seconds: float) -> None:
+        self._pinned_until[scope] = time.monotonic() + seconds
+
+    async def is_pinned(self, scope: str) -> bool:
+        until = self._pinned_until.get(scope)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._pinned_until[scope]
+            return False
+        return True
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(f"cache:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(f"cache:{key}", value, px=int(ttl * 1000))
+
+    # Versions are random tokens rather than counters: a key lost to a
+    # restart without persistence or to eviction comes back as a fresh
+    # token, never as a version some client still holds an ETag for.
+    async def get_version(self, scope: str) -> str:
+        key = f"version:{scope}"
+        version = await self._client.get(key)
+        if version is not None:
+            return version.decode()
+        # NX: concurrent first readers all end up with the same token.
+        token = uuid.uuid4().hex
+        if await self._client.set(key, token, nx=True):
+            return token
+        version = await self._client.get(key)
+        return version.decode() if version is not None else token
+
+    async def bump_version(self, scope: str) -> None:
+        await self._client.set(f"version:{scope}", uuid.uuid4().hex)
+
+    async def pin(self, scope: str, seconds: float) -> None:
+        await self._client.set(f"pin:{scope}", b"1", px=int(seconds * 1000))
+
+    async def is_pinned(self, scope: str) -> bool:
+        return bool(await self._client.exists(f"pin:{scope}"))
+
+
+def build_cache() -> CacheBackend:
+    backend = settings.cache.backend
+    if backend == "redis":
+        if not settings.cache.url:
+            raise RuntimeError("CACHE_BACKEND=redis requires CACHE_URL")
+        return RedisCache(settings.cache.url)
+    if backend == "none":
+        return MemoryCache(max_entries=0)
+    if backend == "memory":
+        return MemoryCache(max_entries=settings.cache.max_entries)
+    raise RuntimeError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+cache = build_cache()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(v) for v in value)
+    return value
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+USERS_SCOPE = "users"
+
+
+async def cache_key(namespace: str, scope: str, params: dict) -> str:
+    normalized = {
+        name: _normalize(value)
+        for name, value in params.items()
+        if value is not None
+    }
+    digest = hashlib.sha1(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    version = await cache.get_version(scope)
+    return f"{namespace}:{scope}:{version}:{digest}"
+
+
+async def get_response(key: str) -> Optional[Response]:
+    entry = await cache.get(key)
+    if entry is None:
+        return None
+    headers, body = entry.split(b"\n", 1)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=json.loads(headers),
+    )
+
+
+async def set_response(key: str, body: bytes, headers: dict) -> Response:
+    entry = json.dumps(headers).encode() + b"\n" + body
+    await cache.set(key, entry, settings.cache.ttl)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def invalidate(scopes: Iterable[str]) -> None:
+    for scope in scopes:
+        await cache.bump_version(scope)
+
+
+async def pin(scopes: Iterable[str], seconds: float) -> None:
+    """Serve reads of ``scopes`` from the primary for ``seconds``.
+
+    Kept in the cache backend so every worker sees it: a worker reading a
+    lagging replica after another one committed would otherwise cache
+    pre-write data under the already bumped version.
+    """
+    for scope in scopes:
+        await cache.pin(scope, seconds)
+
+
+async def is_pinned(scope: str) -> bool:
+    return await cache.is_pinned(scope)
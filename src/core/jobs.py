@@ -0,0 +1,193 @@
+import asyncio
+import enum
+import uuid
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from .logger import setup_logger
+from .settings import settings
+
+
+logger = setup_logger(__name__)
+
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+FINISHED = (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Progress:
+    done: int = 0
+    # None while the handler does not know the amount of work yet
+    total: Optional[int] = None
+
+
+@dataclass
+class Job:
+    kind: str
+    params: dict
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.queued
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set by handlers that call report_progress; None for the others
+    progress: Optional[Progress] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def report_progress(self, done: int, total: Optional[int] = None) -> None:
+        self.progress = Progress(done=done, total=total)
+
+    def finish(self, status: JobStatus) -> None:
+        self.status = status
+        self.finished_at = _now()
+        self.task = None
+
+
+Handler = Callable[[Job], Awaitable[Any]]
+
+
+class JobRunner:
+    """Runs submitted jobs on a fixed number of asyncio workers.
+
+    Jobs live in an in-memory registry: they are lost on restart and each
+    worker process has its own. Only the latest ``history`` finished jobs
+    are kept.
+    """
+
+    def __init__(self, workers: int, queue_size: int, history: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.history = history
+        self._queue: Optional[asyncio.Queue[Job]] = None
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._handlers: dict[str, Handler] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        # Created here so the queue belongs to the running event loop.
+        self._queue = asyncio.Queue(self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{n}")
+            for n in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._queue = None
+        # Queued jobs were never picked up; nothing runs them after this.
+        for job in self._jobs.values():
+            if job.status is JobStatus.queued:
+                job.finish(JobStatus.cancelled)
+
+    def submit(self, kind: str, params: dict) -> Job:
+        if kind not in self._handlers:
+            raise KeyError(kind)
+        if self._queue is None:
+            raise RuntimeError("Job runner is not started")
+        job = Job(kind=kind, params=params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.queue_size} jobs already queued")
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job.task is not None:
+            # The worker records the outcome once the task unwinds.
+            job.task.cancel()
+        else:
+            job.finish(JobStatus.cancelled)
+        return job
+
+    def _prune(self) -> None:
+        finished = [
+            job.id for job in self._jobs.values() if job.status in FINISHED
+        ]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status is JobStatus.queued:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.running
+        job.started_at = _now()
+        job.task = asyncio.create_task(self._handlers[job.kind](job))
+        task = job.task
+        try:
+            # wait() does not raise when the job task is cancelled, so a
+            # CancelledError here always means the worker is stopping.
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            await asyncio.wait({task})
+            job.finish(JobStatus.cancelled)
+            raise
+
+        if task.cancelled():
+            job.finish(JobStatus.cancelled)
+            logger.info(f"Job {job.id} ({job.kind}) cancelled")
+        elif task.exception() is not None:
+            job.error = repr(task.exception())
+            job.finish(JobStatus.failed)
+            logger.error(
+                f"Job {job.id} ({job.kind}) failed",
+                exc_info=task.exception(),
+            )
+        else:
+            job.result = task.result()
+            job.finish(JobStatus.succeeded)
+            logger.info(f"Job {job.id} ({job.kind}) succeeded")
+
+
+jobs = JobRunner(
+    workers=settings.app.job_workers,
+    queue_size=settings.app.job_queue_size,
+    history=settings.app.job_history,
+)
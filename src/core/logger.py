@@ -1,14 +1,93 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 from .settings import settings
 
 
-def setup_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.app.log_level))
+TEXT_FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed via extra=.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the fields passed via extra= merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread and never waits for it.
+
+    When the queue is full the record is dropped and counted; the count is
+    reported as soon as the queue accepts records again.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, while args and frames are
+        # still current; formatting itself is left to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"{self.dropped} log records dropped, queue full",
+                }))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
+def _build_handlers() -> list[logging.Handler]:
     log_dir = Path(settings.app.log_dir)
     log_dir.mkdir(parents=True, exist_ok=True)
 
@@ -20,17 +99,62 @@ def setup_logger(name: str) -> logging.Logger:
         encoding="utf-8"
     )
     file_handler.suffix = "%Y-%m-%d"
-
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     if settings.app.debug:
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(logging.StreamHandler())
+
+    if settings.app.log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+_handlers: Optional[list[logging.Handler]] = None
+_listener: Optional[QueueListener] = None
+
+
+def _get_handlers() -> list[logging.Handler]:
+    """Handlers shared by all loggers, created on first use.
+
+    In queue mode (LOG_QUEUE) callers only get a queue handler; the file
+    and console handlers run on a QueueListener thread, so a slow disk
+    never blocks the event loop.
+    """
+    global _handlers, _listener
+    if _handlers is not None:
+        return _handlers
+
+    handlers = _build_handlers()
+    if settings.app.log_queue:
+        queue_handler = NonBlockingQueueHandler(
+            queue.Queue(maxsize=settings.app.log_queue_size)
+        )
+        _listener = QueueListener(
+            queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+        handlers = [queue_handler]
+
+    if settings.app.log_sample_rate < 1:
+        sampling = SamplingFilter(settings.app.log_sample_rate)
+        for handler in handlers:
+            handler.addFilter(sampling)
+
+    _handlers = handlers
+    return _handlers
+
+
+def setup_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, settings.app.log_level))
+
+    for handler in _get_handlers():
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
 
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,40 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator
+
+
+MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps_line(record: Any) -> str:
+    return json.dumps(record, default=_default, ensure_ascii=False) + "\n"
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, bytes]]:
+    """Split a byte stream into ``(line_number, line)`` pairs.
+
+    Only the current partial line is buffered, so memory stays flat no
+    matter how large the body is. Blank lines are skipped but still counted.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
@@ -0,0 +1,141 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from .logger import setup_logger
+from .settings import settings
+
+
+logger = setup_logger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """SQL statements and DB time spent while serving one request."""
+
+    __slots__ = ("method", "route", "queries", "db_time", "statements", "slow")
+
+    def __init__(self, method: str = "", route: str = ""):
+        self.method = method
+        self.route = route
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements: Counter[str] = Counter()
+        self.slow: list[tuple[str, float]] = []
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+_observers: list[Callable[[RequestStats], None]] = []
+
+
+def record_query(statement: str, elapsed: float) -> None:
+    stats = request_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_time += elapsed
+    stats.statements[statement] += 1
+    if elapsed >= settings.app.slow_query_seconds > 0:
+        stats.slow.append((statement, elapsed))
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+def _shorten(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def check_budget(stats: RequestStats) -> None:
+    """Warn about requests over the statement budget, slow or repeated SQL."""
+    app = settings.app
+    where = f"{stats.method} {stats.route}"
+    if 0 < app.query_budget < stats.queries:
+        logger.warning(
+            f"{where} ran {stats.queries} SQL statements "
+            f"(budget {app.query_budget}) in {stats.db_time * 1000:.1f}ms"
+        )
+    for statement, elapsed in stats.slow:
+        logger.warning(
+            f"{where} slow SQL statement ({elapsed * 1000:.1f}ms): "
+            f"{_shorten(statement)}"
+        )
+    if app.query_repeat_threshold > 0:
+        for statement, count in stats.repeated(app.query_repeat_threshold):
+            logger.warning(
+                f"{where} possible N+1, statement ran {count} times: "
+                f"{_shorten(statement)}"
+            )
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware counting SQL statements per request.
+
+    In debug mode the count and DB time are added as X-DB-Queries and
+    X-DB-Time response headers (for streamed bodies, as of the first
+    chunk). Budget violations are logged once the request finishes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"])
+        send_wrapper = send
+        if settings.app.debug:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"x-db-time", f"{stats.db_time * 1000:.2f}ms".encode()),
+                    ]
+                await send(message)
+
+        token = request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            stats.route = route_label(scope)
+            check_budget(stats)
+            for observer in _observers:
+                observer(stats)
+
+
+@contextmanager
+def capture_query_stats() -> Iterator[list[RequestStats]]:
+    """Collect the RequestStats of every request served inside the block.
+
+    Works with TestClient, which serves requests on another thread:
+
+        with capture_query_stats() as captured:
+            client.patch("/items/1", params={"user_id": 1}, json=...)
+        assert captured[0].queries <= 3
+    """
+    captured: list[RequestStats] = []
+    _observers.append(captured.append)
+    try:
+        yield captured
+    finally:
+        _observers.remove(captured.append)
+
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -18,6 +19,34 @@ class DatabaseSettings(BaseSettings):
     postgres_user: str = Field(..., alias="POSTGRES_USER")
     postgres_password: str = Field(..., alias="POSTGRES_PASSWORD")
 
+    pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(30, alias="DB_POOL_TIMEOUT")
+    pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    pool_use_lifo: bool = Field(True, alias="DB_POOL_USE_LIFO")
+    # always: ping on every checkout, idle: only connections idle longer
+    # than DB_POOL_PRE_PING_IDLE_SECONDS, never: rely on pool_recycle
+    pool_pre_ping: Literal["always", "idle", "never"] = Field(
+        "idle", alias="DB_POOL_PRE_PING"
+    )
+    pool_pre_ping_idle_seconds: float = Field(
+        30, alias="DB_POOL_PRE_PING_IDLE_SECONDS"
+    )
+    # 0 disables prepared statement caching (required behind pgbouncer in
+    # transaction mode)
+    statement_cache_size: int = Field(100, alias="DB_STATEMENT_CACHE_SIZE")
+    connect_timeout: float = Field(10, alias="DB_CONNECT_TIMEOUT")
+    command_timeout: float | None = Field(None, alias="DB_COMMAND_TIMEOUT")
+
+    # Comma separated SQLAlchemy URLs of read replicas for GET endpoints
+    replica_urls_raw: str = Field("", alias="DB_REPLICA_URLS")
+    replica_retry_seconds: float = Field(30, alias="DB_REPLICA_RETRY_SECONDS")
+    # Serve a user's reads from the primary for this long after they write;
+    # keep it above the replication lag so cached listings are never stale
+    read_your_writes_seconds: float = Field(
+        5, alias="DB_READ_YOUR_WRITES_SECONDS"
+    )
+
     @property
     def url(self) -> str:
         return (
@@ -26,16 +55,56 @@ class DatabaseSettings(BaseSettings):
             f"{self.db_port}/{self.postgres_db}"
         )
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            url.strip()
+            for url in self.replica_urls_raw.split(",")
+            if url.strip()
+        ]
+
 
 class AppSettings(BaseSettings):
     log_level: str = Field("INFO", alias="LOG_LEVEL")
     log_dir: str = Field(..., alias="LOG_DIR")
+    # text or json (one object per line)
+    log_format: str = Field("text", alias="LOG_FORMAT")
+    # Write logs from a background thread; records are dropped, not
+    # waited on, once LOG_QUEUE_SIZE are pending
+    log_queue: bool = Field(True, alias="LOG_QUEUE")
+    log_queue_size: int = Field(10_000, alias="LOG_QUEUE_SIZE")
+    # Fraction of records below WARNING that are kept
+    log_sample_rate: float = Field(1.0, alias="LOG_SAMPLE_RATE")
     debug: bool = Field(False, alias="DEBUG")
+    metrics_enabled: bool = Field(True, alias="METRICS_ENABLED")
+    # Warn when a request runs more SQL statements than this (0 disables),
+    # any statement takes longer than SLOW_QUERY_SECONDS, or the same
+    # statement repeats QUERY_REPEAT_THRESHOLD times (a likely N+1)
+    query_budget: int = Field(10, alias="QUERY_BUDGET")
+    slow_query_seconds: float = Field(0.5, alias="SLOW_QUERY_SECONDS")
+    query_repeat_threshold: int = Field(5, alias="QUERY_REPEAT_THRESHOLD")
+    # include_total counts listings exactly up to this many matches and
+    # reports the planner estimate above it
+    total_count_exact_limit: int = Field(10_000, alias="TOTAL_COUNT_EXACT_LIMIT")
+    # Background jobs (POST /admin/jobs): concurrent workers, pending jobs
+    # accepted before submissions are refused, finished jobs remembered
+    job_workers: int = Field(2, alias="JOB_WORKERS")
+    job_queue_size: int = Field(100, alias="JOB_QUEUE_SIZE")
+    job_history: int = Field(1000, alias="JOB_HISTORY")
+
+
+class CacheSettings(BaseSettings):
+    # memory: per-process LRU, redis: shared between workers, none: disabled
+    backend: str = Field("memory", alias="CACHE_BACKEND")
+    url: str | None = Field(None, alias="CACHE_URL")
+    ttl: float = Field(60, alias="CACHE_TTL")
+    max_entries: int = Field(10_000, alias="CACHE_MAX_ENTRIES")
 
 
 class Settings:
     database: DatabaseSettings = DatabaseSettings()
     app: AppSettings = AppSettings()
+    cache: CacheSettings = CacheSettings()
 
 
 settings = Settings()
@@ -1,5 +1,10 @@
+import asyncio
+import itertools
+import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
@@ -9,34 +14,176 @@ from sqlalchemy.ext.asyncio import (
 
 from src.core import settings
 from src.core import setup_logger
+from src.core.cache import invalidate, is_pinned, pin, user_scope
+from src.database.metrics import instrument_engine
 from src.database.models import BaseModel
+from src.database.pool import InstrumentedPool, ping_idle_connections
 
 
 logger = setup_logger(__name__)
 
+CHANGED_SCOPES = "changed_scopes"
+WRITTEN_USERS = "written_users"
+
+
+def mark_changed(session: AsyncSession, scope: str) -> None:
+    """Record that the transaction modified data in a cache scope.
+
+    Cached reads of that scope are invalidated once the transaction commits.
+    """
+    session.info.setdefault(CHANGED_SCOPES, set()).add(scope)
+
+
+def mark_user_changed(session: AsyncSession, user_id: int) -> None:
+    mark_changed(session, user_scope(user_id))
+    session.info.setdefault(WRITTEN_USERS, set()).add(user_id)
+
 
 class DatabaseConnection:
     _engine: AsyncEngine = None
     _session_factory: async_sessionmaker = None
+    _replica_engines: list[AsyncEngine] = None
+    _read_factories: dict[tuple[Optional[int], bool], async_sessionmaker] = {}
+    _replica_down_until: dict[int, float] = {}
+    _replica_counter = itertools.count()
+
+    @staticmethod
+    def _create_engine(url: str, name: str) -> AsyncEngine:
+        db = settings.database
+        connect_args = {
+            "timeout": db.connect_timeout,
+            "statement_cache_size": db.statement_cache_size,
+            "prepared_statement_cache_size": db.statement_cache_size,
+        }
+        if db.command_timeout is not None:
+            connect_args["command_timeout"] = db.command_timeout
+        engine = create_async_engine(
+            url,
+            echo=settings.app.debug,
+            poolclass=InstrumentedPool,
+            pool_size=db.pool_size,
+            max_overflow=db.max_overflow,
+            pool_timeout=db.pool_timeout,
+            pool_recycle=db.pool_recycle,
+            pool_use_lifo=db.pool_use_lifo,
+            pool_pre_ping=db.pool_pre_ping == "always",
+            connect_args=connect_args,
+        )
+        if db.pool_pre_ping == "idle":
+            ping_idle_connections(
+                engine.sync_engine, db.pool_pre_ping_idle_seconds
+            )
+        instrument_engine(engine.sync_engine, name)
+        return engine
 
     @classmethod
     def get_engine(cls) -> AsyncEngine:
         if cls._engine is None:
-            cls._engine = create_async_engine(
-                settings.database.url,
-                echo=settings.app.debug,
-                pool_pre_ping=True,
-            )
+            cls._engine = cls._create_engine(settings.database.url, "primary")
             logger.info("Database engine created")
         return cls._engine
 
+    @classmethod
+    def get_replica_engines(cls) -> list[AsyncEngine]:
+        if cls._replica_engines is None:
+            cls._replica_engines = [
+                cls._create_engine(url, f"replica{index}")
+                for index, url in enumerate(settings.database.replica_urls)
+            ]
+            if cls._replica_engines:
+                logger.info(f"{len(cls._replica_engines)} replica engines created")
+        return cls._replica_engines
+
+    @classmethod
+    def get_read_session_factory(
+        cls, replica: Optional[int] = None, transaction: bool = False
+    ) -> async_sessionmaker:
+        """Session factory for reads on the primary or a replica by index.
+
+        Sessions run in autocommit unless a transaction is requested, in
+        which case it is opened as READ ONLY. Either way there is nothing
+        to commit, so loaded objects are never expired.
+        """
+        key = (replica, transaction)
+        if key not in cls._read_factories:
+            engine = (
+                cls.get_engine() if replica is None
+                else cls.get_replica_engines()[replica]
+            )
+            if transaction:
+                options = {"postgresql_readonly": True}
+            else:
+                options = {"isolation_level": "AUTOCOMMIT"}
+            cls._read_factories[key] = async_sessionmaker(
+                bind=engine.execution_options(**options),
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+        return cls._read_factories[key]
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        return {
+            "primary": cls.get_engine().pool.stats(),
+            "replicas": [
+                {
+                    **engine.pool.stats(),
+                    "healthy": cls._replica_healthy(index),
+                }
+                for index, engine in enumerate(cls.get_replica_engines())
+            ],
+        }
+
+    @classmethod
+    def _replica_healthy(cls, index: int) -> bool:
+        return cls._replica_down_until.get(index, 0) <= time.monotonic()
+
+    @classmethod
+    async def _pin_to_primary(cls, user_ids) -> None:
+        seconds = settings.database.read_your_writes_seconds
+        if seconds <= 0 or not cls.get_replica_engines():
+            return
+        await pin([user_scope(user_id) for user_id in user_ids], seconds)
+
+    @classmethod
+    async def _is_pinned(cls, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        return await is_pinned(user_scope(user_id))
+
+    @classmethod
+    async def _open_replica_session(
+        cls, transaction: bool
+    ) -> Optional[AsyncSession]:
+        """Round-robin over healthy replicas, marking failing ones down."""
+        count = len(cls.get_replica_engines())
+        start = next(cls._replica_counter)
+        for offset in range(count):
+            index = (start + offset) % count
+            if not cls._replica_healthy(index):
+                continue
+            session = cls.get_read_session_factory(index, transaction)()
+            try:
+                await session.connection()
+            except (OSError, asyncio.TimeoutError, exc.DBAPIError) as e:
+                await session.close()
+                cls._replica_down_until[index] = (
+                    time.monotonic() + settings.database.replica_retry_seconds
+                )
+                logger.warning(f"Replica {index} marked down: {e}")
+                continue
+            return session
+        return None
+
     @classmethod
     def get_session_factory(cls) -> async_sessionmaker:
         if cls._session_factory is None:
             cls._session_factory = async_sessionmaker(
                 bind=cls.get_engine(),
                 class_=AsyncSession,
-                expire_on_commit=True
+                # Write routes commit before the response is serialized
+                # (see get_db_session), so returned objects must stay loaded.
+                expire_on_commit=False
             )
             logger.info("Session factory created")
         return cls._session_factory
@@ -49,9 +196,45 @@ class DatabaseConnection:
             try:
                 yield session
                 await session.commit()
+                await invalidate(session.info.pop(CHANGED_SCOPES, ()))
+                await cls._pin_to_primary(session.info.pop(WRITTEN_USERS, ()))
             except Exception as e:
                 logger.exception(f"Session rollback because of exception: {e}")
                 await session.rollback()
                 raise
             finally:
                 await session.close()
+
+    @classmethod
+    @asynccontextmanager
+    async def get_read_session(
+        cls, user_id: Optional[int] = None, transaction: bool = False
+    ) -> AsyncSession:
+        """Session for read-only work, served by a replica when possible.
+
+        Falls back to the primary when no replica is configured or healthy,
+        and for users that wrote within DB_READ_YOUR_WRITES_SECONDS.
+        Statements run in autocommit, so a simple fetch is one round-trip;
+        pass transaction=True for work that needs a snapshot or a
+        server-side cursor.
+        """
+        session = None
+        if cls.get_replica_engines() and not await cls._is_pinned(user_id):
+            session = await cls._open_replica_session(transaction)
+        if session is None:
+            session = cls.get_read_session_factory(None, transaction)()
+        async with session:
+            try:
+                yield session
+            except Exception as e:
+                logger.exception(f"Read session failed because of exception: {e}")
+                raise
+
+    @classmethod
+    def get_stream_session(cls, user_id: Optional[int] = None):
+        """Read session owned by a streamed response body.
+
+        The stream outlives the request handler (and its dependencies), so
+        it opens its own session; server-side cursors need a transaction.
+        """
+        return cls.get_read_session(user_id, transaction=True)
@@ -3,5 +3,31 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 
 async def get_db_session() -> AsyncSession:
+    """Write session; depend on it with ``scope="function"``.
+
+    With the default request scope FastAPI runs the teardown (commit and
+    cache invalidation) only after the response has been sent, so a client
+    could read stale data right after its own write.
+    """
     async with DatabaseConnection.get_session() as session:
         yield session
+
+
+async def get_db_read_session() -> AsyncSession:
+    """Read session for routes that are not scoped to a user."""
+    async with DatabaseConnection.get_read_session() as session:
+        yield session
+
+
+def get_db_user_read_session(default: int = ...):
+    """Read session for routes scoped to a ``user_id`` parameter.
+
+    The dependency declares ``user_id`` the way the route does (pass the
+    route's default, if it has one), so FastAPI resolves both to the same
+    value and a user who just wrote is read from the primary.
+    """
+    async def dependency(user_id: int = default) -> AsyncSession:
+        async with DatabaseConnection.get_read_session(user_id) as session:
+            yield session
+
+    return dependency
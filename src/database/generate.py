@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from bisect import bisect
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import setup_logger
+from src.core.cache import USERS_SCOPE
+from src.database.connection import DatabaseConnection, mark_changed
+from src.database.models import KindEnum, PriorityEnum, StatusEnum
+
+
+logger = setup_logger(__name__)
+
+WORDS = (
+    "python", "history", "design", "systems", "data", "market", "empire",
+    "science", "fiction", "guide", "notes", "theory", "practice", "modern",
+    "art", "war", "peace", "network", "cloud", "garden", "music", "travel",
+    "economy", "mind", "ocean", "city", "code", "light", "machine", "river",
+)
+TAG_WORDS = (
+    "reading", "fiction", "science", "business", "history", "tech", "later",
+    "favorite", "work", "research", "classic", "short", "long", "review",
+)
+
+# Roughly what a real reading list looks like: most things are planned,
+# few are high priority.
+STATUS_WEIGHTS = {
+    StatusEnum.planned: 50, StatusEnum.reading: 15, StatusEnum.done: 35,
+}
+KIND_WEIGHTS = {KindEnum.book: 40, KindEnum.article: 60}
+PRIORITY_WEIGHTS = {
+    PriorityEnum.low: 25, PriorityEnum.normal: 60, PriorityEnum.high: 15,
+}
+
+TITLE_POOL_SIZE = 50_000
+
+# Called with (items written, items planned)
+ProgressCallback = Callable[[int, int], None]
+
+ITEM_COLUMNS = (
+    "id", "user_id", "title", "kind", "status", "priority", "notes",
+    "created_at", "updated_at",
+)
+
+
+@dataclass
+class GenerateParams:
+    users: int = 100
+    items_per_user: int = 100
+    tags_per_user: int = 20
+    # Average number of tags attached to an item
+    tag_fanout: float = 1.5
+    # 0 spreads items and tag usage evenly; higher values give a long tail
+    # of light users and a few heavy ones, and a few very popular tags
+    skew: float = 1.0
+    seed: Optional[int] = None
+    # Items per COPY batch; each batch is its own transaction
+    batch_size: int = 50_000
+    # Batches copied at the same time, each on its own pool connection
+    concurrency: int = 4
+
+
+@dataclass
+class GenerateResult:
+    users: int = 0
+    tags: int = 0
+    items: int = 0
+    item_tags: int = 0
+    seconds: float = 0.0
+    user_ids: list[int] = field(default_factory=list)
+
+
+def _cumulative(weights: dict) -> tuple[list, list[float]]:
+    return [value.value for value in weights], list(accumulate(weights.values()))
+
+
+def _items_per_user(rng: random.Random, params: GenerateParams) -> list[int]:
+    """Item counts with the requested mean, Pareto distributed when skewed."""
+    if params.skew <= 0 or params.items_per_user <= 0:
+        return [params.items_per_user] * params.users
+    alpha = 1 + 1 / params.skew
+    raw = [rng.paretovariate(alpha) for _ in range(params.users)]
+    scale = params.items_per_user * params.users / sum(raw)
+    return [round(value * scale) for value in raw]
+
+
+async def _reserve_ids(session: AsyncSession, table: str, count: int) -> int:
+    """Advance the id sequence by count and return the first reserved id.
+
+    The caller holds a lock that blocks other inserts into the table, so
+    nobody can take a value from the sequence in between.
+    """
+    if count == 0:
+        return 0
+    last = await session.scalar(
+        text(
+            "SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+            "nextval(pg_get_serial_sequence(:table, 'id')) + :count - 1)"
+        ),
+        {"table": table, "count": count},
+    )
+    return last - count + 1
+
+
+async def _copy(session: AsyncSession, table: str, columns, records) -> None:
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table, records=records, columns=columns
+    )
+
+
+@dataclass
+class _Batch:
+    users: list[tuple] = field(default_factory=list)
+    tags: list[tuple] = field(default_factory=list)
+    items: list[tuple] = field(default_factory=list)
+    links: list[tuple] = field(default_factory=list)
+    stats: list[tuple] = field(default_factory=list)
+
+
+class _Generator:
+    def __init__(
+        self,
+        params: GenerateParams,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        self.params = params
+        self.on_progress = on_progress
+        self.rng = random.Random(params.seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.now = datetime.now(timezone.utc)
+        self.statuses = _cumulative(STATUS_WEIGHTS)
+        self.kinds = _cumulative(KIND_WEIGHTS)
+        self.priorities = _cumulative(PRIORITY_WEIGHTS)
+        # Zipf-like popularity of a user's tags, by rank
+        self.tag_weights = list(accumulate(
+            1 / (rank ** params.skew) for rank in range(1, params.tags_per_user + 1)
+        ))
+        # Drawing titles from a pool is several times cheaper than building
+        # each one, and still gives search plenty of distinct documents.
+        self.titles = [
+            " ".join(self.rng.choices(WORDS, k=self.rng.randint(2, 6))).capitalize()
+            for _ in range(TITLE_POOL_SIZE)
+        ]
+
+    def _choice(self, options: tuple[list, list[float]]) -> str:
+        values, cumulative = options
+        return values[bisect(cumulative, self.rng.random() * cumulative[-1])]
+
+    def _title(self) -> str:
+        return self.titles[int(self.rng.random() * TITLE_POOL_SIZE)]
+
+    def _tag_count(self) -> int:
+        limit = self.params.tags_per_user
+        if limit == 0 or self.params.tag_fanout <= 0:
+            return 0
+        return min(int(self.rng.expovariate(1 / self.params.tag_fanout) + 0.5), limit)
+
+    def build(
+        self,
+        first_number: int,
+        item_counts: list[int],
+        first_user: int,
+        first_tag: int,
+        first_item: int,
+    ) -> _Batch:
+        """Rows for a run of users whose ids start at the given values."""
+        params = self.params
+        rng = self.rng
+        batch = _Batch()
+        item_id = first_item
+        for offset, count in enumerate(item_counts):
+            user_id = first_user + offset
+            number = first_number + offset
+            created = self.now - timedelta(days=rng.uniform(30, 1000))
+            batch.users.append((
+                user_id,
+                f"gen-{self.run_id}-{number}@example.com",
+                f"User {number}",
+                created,
+            ))
+            tag_ids = [
+                first_tag + offset * params.tags_per_user + n
+                for n in range(params.tags_per_user)
+            ]
+            for n, tag_id in enumerate(tag_ids):
+                word = TAG_WORDS[n % len(TAG_WORDS)]
+                batch.tags.append((tag_id, user_id, f"{word}-{n}"))
+
+            counters = {("total", ""): count}
+            age = (self.now - created).total_seconds()
+            for _ in range(count):
+                item_created = created + timedelta(seconds=rng.random() * age)
+                kind = self._choice(self.kinds)
+                status = self._choice(self.statuses)
+                priority = self._choice(self.priorities)
+                batch.items.append((
+                    item_id,
+                    user_id,
+                    self._title(),
+                    kind,
+                    status,
+                    priority,
+                    self._title() if rng.random() < 0.3 else None,
+                    item_created,
+                    item_created + timedelta(seconds=rng.random() * 86400),
+                ))
+                for key in (("kind", kind), ("status", status), ("priority", priority)):
+                    counters[key] = counters.get(key, 0) + 1
+                tag_count = self._tag_count() if tag_ids else 0
+                if tag_count:
+                    total = self.tag_weights[-1]
+                    chosen = {
+                        tag_ids[bisect(self.tag_weights, rng.random() * total)]
+                        for _ in range(tag_count)
+                    }
+                    for tag_id in chosen:
+                        batch.links.append((item_id, tag_id))
+                        key = ("tag", str(tag_id))
+                        counters[key] = counters.get(key, 0) + 1
+                item_id += 1
+            # New users have no counters yet, so plain rows are enough.
+            batch.stats.extend(
+                (user_id, dimension, value, n)
+                for (dimension, value), n in counters.items()
+            )
+        return batch
+
+    async def reserve(self, users: int, items: int) -> tuple[int, int, int]:
+        async with DatabaseConnection.get_session() as session:
+            await session.execute(
+                text("LOCK TABLE users, tags, items IN SHARE ROW EXCLUSIVE MODE")
+            )
+            return (
+                await _reserve_ids(session, "users", users),
+                await _reserve_ids(session, "tags", users * self.params.tags_per_user),
+                await _reserve_ids(session, "items", items),
+            )
+
+    @staticmethod
+    async def write(batch: _Batch) -> None:
+        async with DatabaseConnection.get_session() as session:
+            await _copy(session, "users", ("id", "email", "display_name", "created_at"), batch.users)
+            await _copy(session, "tags", ("id", "user_id", "name"), batch.tags)
+            await _copy(session, "items", ITEM_COLUMNS, batch.items)
+            await _copy(session, "item_tag", ("item_id", "tag_id"), batch.links)
+            await _copy(session, "item_stats", ("user_id", "dimension", "value", "count"), batch.stats)
+            mark_changed(session, USERS_SCOPE)
+
+    async def run(self) -> GenerateResult:
+        started = time.perf_counter()
+        counts = _items_per_user(self.rng, self.params)
+        first_user, first_tag, first_item = await self.reserve(len(counts), sum(counts))
+
+        # Split into runs of users holding about batch_size items each.
+        plans = []
+        start = 0
+        while start < len(counts):
+            end, size = start, 0
+            while end < len(counts) and (end == start or size < self.params.batch_size):
+                size += counts[end]
+                end += 1
+            plans.append((
+                start,
+                counts[start:end],
+                first_user + start,
+                first_tag + start * self.params.tags_per_user,
+                first_item + sum(counts[:start]),
+            ))
+            start = end
+
+        # Batches are built one after another on a thread (the random
+        # stream stays deterministic) while up to `concurrency` earlier
+        # batches are being copied on their own connections.
+        result = GenerateResult(user_ids=list(range(first_user, first_user + len(counts))))
+        total = sum(counts)
+        if self.on_progress is not None:
+            self.on_progress(0, total)
+        slots = asyncio.Semaphore(self.params.concurrency)
+
+        async def write(batch: _Batch) -> None:
+            try:
+                await self.write(batch)
+            finally:
+                slots.release()
+            result.users += len(batch.users)
+            result.tags += len(batch.tags)
+            result.items += len(batch.items)
+            result.item_tags += len(batch.links)
+            logger.info(f"Generated {result.items} of {total} items")
+            if self.on_progress is not None:
+                self.on_progress(result.items, total)
+
+        writes = []
+        try:
+            for plan in plans:
+                batch = await asyncio.to_thread(self.build, *plan)
+                await slots.acquire()
+                writes.append(asyncio.create_task(write(batch)))
+                for task in writes:
+                    if task.done():
+                        task.result()
+            await asyncio.gather(*writes)
+        except BaseException:
+            for task in writes:
+                task.cancel()
+            raise
+
+        result.seconds = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Generated {result.users} users, {result.items} items, "
+            f"{result.item_tags} tag links in {result.seconds}s"
+        )
+        return result
+
+
+async def run_generate(
+    params: GenerateParams,
+    on_progress: Optional[ProgressCallback] = None,
+) -> GenerateResult:
+    """Bulk-load synthetic users, tags and items through COPY.
+
+    Ids for the whole run are reserved from the sequences up front (under
+    a short lock), so item_tag and item_stats rows are built without
+    reading anything back. Each batch is COPYed in its own transaction, so
+    an interrupted run leaves whole users behind, never partial ones.
+
+    ``on_progress(done, total)`` is called with item counts after every
+    committed batch.
+    """
+    return await _Generator(params, on_progress).run()
+
+
+if __name__ == "__main__":
+    defaults = GenerateParams()
+    parser = argparse.ArgumentParser(
+        description="Bulk-load synthetic users, tags and items for capacity tests."
+    )
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument(
+        "--items-per-user", type=int, default=defaults.items_per_user,
+        help="mean items per user",
+    )
+    parser.add_argument("--tags-per-user", type=int, default=defaults.tags_per_user)
+    parser.add_argument(
+        "--tag-fanout", type=float, default=defaults.tag_fanout,
+        help="mean tags per item",
+    )
+    parser.add_argument(
+        "--skew", type=float, default=defaults.skew,
+        help="0 for uniform data, higher for heavier tails",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument(
+        "--concurrency", type=int, default=defaults.concurrency,
+        help="batches copied in parallel",
+    )
+    args = parser.parse_args()
+    result = asyncio.run(run_generate(GenerateParams(
+        users=args.users,
+        items_per_user=args.items_per_user,
+        tags_per_user=args.tags_per_user,
+        tag_fanout=args.tag_fanout,
+        skew=args.skew,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )))
+    print(
+        f"{result.users} users, {result.tags} tags, {result.items} items, "
+        f"{result.item_tags} tag links in {result.seconds}s"
+    )
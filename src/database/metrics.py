@@ -0,0 +1,70 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.metrics import Counter, Gauge, observe_query, registry
+from src.core.query_stats import record_query
+
+
+_engines: dict[str, Engine] = {}
+
+pool_connections = registry.register(Gauge(
+    "db_pool_connections",
+    "Pool connections by state.",
+    ("engine", "state"),
+))
+pool_size = registry.register(Gauge(
+    "db_pool_size",
+    "Configured pool size; overflow connections come on top.",
+    ("engine",),
+))
+pool_checkouts = registry.register(Counter(
+    "db_pool_checkouts_total",
+    "Connections handed out by the pool.",
+    ("engine",),
+))
+pool_timeouts = registry.register(Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT.",
+    ("engine",),
+))
+pool_wait = registry.register(Counter(
+    "db_pool_wait_seconds_total",
+    "Time spent waiting for a pool connection.",
+    ("engine",),
+))
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time every statement and expose the engine's pool at scrape time.
+
+    Statements are also recorded against the current request for the
+    query budget checks.
+    """
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        observe_query(name, elapsed)
+        record_query(statement, elapsed)
+
+
+def collect_pool_metrics() -> None:
+    for name, engine in _engines.items():
+        stats = engine.pool.stats()
+        pool_size.set(stats["size"], (name,))
+        pool_connections.set(stats["checked_out"], (name, "checked_out"))
+        pool_connections.set(stats["checked_in"], (name, "checked_in"))
+        pool_connections.set(max(stats["overflow"], 0), (name, "overflow"))
+        pool_checkouts.set(stats["checkouts"], (name,))
+        pool_timeouts.set(stats["timeouts"], (name,))
+        pool_wait.set(stats["wait_time_total"], (name,))
+
+
+registry.add_collector(collect_pool_metrics)
@@ -5,20 +5,28 @@ from typing import List, Optional
 
 from sqlalchemy import (
     Column,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     MetaData,
+    PrimaryKeyConstraint,
     String,
     Table,
     Text,
     UniqueConstraint,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm import mapped_column, relationship, Mapped
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 @as_declarative()
 class BaseModel:
     __abstract__ = True
@@ -52,6 +60,12 @@ class PriorityEnum(str, enum.Enum):
     high = "high"
 
 
+# Text search configuration used both for the stored items.search_vector
+# column and for parsing search queries; "simple" keeps matching
+# language-agnostic for mixed-language libraries.
+SEARCH_CONFIG = "simple"
+
+
 item_tag = Table(
     "item_tag",
     BaseModel.metadata,
@@ -64,6 +78,25 @@ item_tag = Table(
         "tag_id",
         ForeignKey(column="tags.id", ondelete="CASCADE"),
         primary_key=True),
+    Index("ix_item_tag_tag_id_item_id", "tag_id", "item_id"),
+)
+
+
+# Per-user item counters maintained incrementally by ItemRepository.
+# dimension is "total", "status", "kind", "priority" or "tag"; value is the
+# enum value or the tag id ("" for the total).
+item_stats = Table(
+    "item_stats",
+    BaseModel.metadata,
+    Column(
+        "user_id",
+        ForeignKey(column="users.id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    Column("dimension", String, nullable=False),
+    Column("value", String, nullable=False),
+    Column("count", Integer, nullable=False, default=0),
+    PrimaryKeyConstraint("user_id", "dimension", "value"),
 )
 
 
@@ -75,6 +108,16 @@ class Users(BaseModel):
     items: Mapped[List["Items"]] = relationship(
         "Items", back_populates="users", cascade="all, delete-orphan"
     )
+    __table_args__ = (
+        # Listing order and keyset, and the created_at range filter.
+        Index("ix_users_created_at", "created_at", "id"),
+        # Serves email prefix LIKE whatever the database collation.
+        Index(
+            "ix_users_email_pattern",
+            "email",
+            postgresql_ops={"email": "text_pattern_ops"},
+        ),
+    )
 
 
 class Tags(BaseModel):
@@ -89,6 +132,13 @@ class Tags(BaseModel):
     items = relationship("Items", secondary=item_tag, back_populates="tags")
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="unique_user_tags"),
+        # Serves prefix LIKE for autocomplete whatever the database collation.
+        Index(
+            "ix_tags_user_id_name_pattern",
+            "user_id",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
     )
 
 
@@ -107,12 +157,45 @@ class Items(BaseModel):
         Enum(PriorityEnum), nullable=False, default=PriorityEnum.normal
     )
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
     updated_at: Mapped[DateTime] = mapped_column(
-        DateTime(timezone=True), onupdate=datetime.now(timezone.utc)
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow
+    )
+
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')"
+            f" || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(notes, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
     )
 
     users: Mapped["Users"] = relationship("Users", back_populates="items")
     tags: Mapped[List["Tags"]] = relationship(
         "Tags", secondary=item_tag, back_populates="items"
     )
+    __table_args__ = (
+        Index("ix_items_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_items_user_id_updated_at", "user_id", "updated_at", "id"),
+        Index("ix_items_user_id_priority", "user_id", "priority", "id"),
+        Index(
+            "ix_items_user_id_status_created_at",
+            "user_id", "status", "created_at", "id",
+        ),
+        Index(
+            "ix_items_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_items_user_id_search_vector",
+            "user_id",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import enum
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Enum, Select, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(payload, dict):
+        raise InvalidCursorError("Malformed cursor")
+    return payload
+
+
+def dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def load_value(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    column_type = column.type
+    try:
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column_type, Enum) and column_type.enum_class:
+            return column_type.enum_class(value)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor value") from e
+    return value
+
+
+def keyset_condition(
+    field: InstrumentedAttribute,
+    id_field: InstrumentedAttribute,
+    value: Any,
+    last_id: int,
+    descending: bool,
+):
+    """Rows strictly after ``(value, last_id)`` in ``ORDER BY field, id``.
+
+    Postgres puts NULLs last in ascending order and first in descending
+    order, so nullable sort columns need an explicit NULL branch.
+    """
+    nullable = getattr(field.expression, "nullable", True)
+    if value is None:
+        if descending:
+            return or_(field.is_not(None), and_(field.is_(None), id_field < last_id))
+        return and_(field.is_(None), id_field > last_id)
+
+    if descending:
+        condition = tuple_(field, id_field) < tuple_(value, last_id)
+    else:
+        condition = tuple_(field, id_field) > tuple_(value, last_id)
+    if nullable and not descending:
+        condition = or_(condition, field.is_(None))
+    return condition
+
+
+def escape_like(text: str) -> str:
+    """Escape LIKE wildcards so ``text`` matches literally (with ``escape="\\"``)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, with its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(session: AsyncSession, stmt: Select) -> int:
+    """Row count the planner expects ``stmt`` to return, without running it."""
+    result = await session.execute(Explain(stmt))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+from typing import Optional
+
+from src.database.connection import DatabaseConnection
+from src.database.repositories import StatsRepository
+
+
+async def run_rebuild_stats(user_id: Optional[int] = None) -> None:
+    async with DatabaseConnection.get_session() as db:
+        await StatsRepository(db).rebuild(user_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute item_stats counters from items and item_tag."
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None,
+        help="rebuild a single user (default: everyone)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run_rebuild_stats(args.user_id))
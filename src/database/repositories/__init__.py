@@ -1,3 +1,4 @@
 from .items import ItemRepository
+from .stats import StatsRepository
 from .tags import TagRepository
 from .users import UserRepository
@@ -1,6 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.connection import mark_user_changed
+
 
 class BaseRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
+
+    def _mark_changed(self, user_id: int) -> None:
+        mark_user_changed(self.session, user_id)
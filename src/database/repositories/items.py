@@ -1,19 +1,212 @@
-from typing import List, Optional, Sequence
-from sqlalchemy import select, update, delete, asc, desc
-from sqlalchemy.orm import joinedload
+import re
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    any_,
+    exists,
+    literal,
+    true,
+    insert,
+    select,
+    update,
+    delete,
+    asc,
+    desc,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.dialects.postgresql.dml import OnConflictDoNothing
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql.dml import Insert
 
+from src.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    dump_value,
+    encode_cursor,
+    estimate_count,
+    keyset_condition,
+    load_value,
+)
 from src.database.repositories.base import BaseRepository
-from src.database.models import Items, Tags
+from src.database.repositories.stats import (
+    ITEM_DIMENSIONS,
+    StatsDelta,
+    StatsRepository,
+    item_delta,
+    tags_delta,
+)
+from src.database.models import SEARCH_CONFIG, Items, Tags, item_tag, utcnow
+
+
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+FILTERS = (
+    "status", "kind", "priority", "tags_any", "tags_all", "tags_none",
+    "title_substring", "created_from", "created_to",
+)
+
+# Item columns exposed by the API, in ItemOut order.
+ITEM_COLUMNS = (
+    "id", "title", "kind", "status", "priority", "notes",
+    "created_at", "updated_at",
+)
+
+
+def prefix_tsquery(text: str) -> Optional[str]:
+    """Turn free text into a tsquery where every word matches as a prefix."""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def any_of(ids: Sequence[int]):
+    """``= ANY(:ids)`` with a single array parameter instead of an IN list."""
+    return any_(literal(list(ids), ARRAY(Integer)))
+
+
+def tagged_with(tag_ids: Sequence[int]):
+    """Semi-join: the item has at least one of ``tag_ids``."""
+    return exists().where(
+        item_tag.c.item_id == Items.id,
+        item_tag.c.tag_id.in_(tag_ids),
+    )
+
+
+def tagged_with_all(tag_ids: Sequence[int]):
+    """The item carries every tag in ``tag_ids``."""
+    wanted = set(tag_ids)
+    matched = (
+        select(func.count())
+        .select_from(item_tag)
+        .where(
+            item_tag.c.item_id == Items.id,
+            item_tag.c.tag_id.in_(wanted),
+        )
+        .scalar_subquery()
+    )
+    return matched == len(wanted)
+
+
+class _DoNothing(OnConflictDoNothing):
+    # No conflict target or WHERE, so nothing to put in the cache key.
+    inherit_cache = True
+    _traverse_internals = []
+
+
+class InsertIgnoring(Insert):
+    """``INSERT ... ON CONFLICT DO NOTHING`` that SQLAlchemy can cache.
+
+    The postgresql ``insert()`` opts out of the compiled cache, so a
+    statement embedding it is recompiled on every execution; that cost
+    dominated PATCH /items/{id} with a tag change.
+    """
+
+    inherit_cache = True
+
+    def __init__(self, table):
+        super().__init__(table)
+        self._post_values_clause = _DoNothing()
+
+
+def tag_ids_of_item():
+    """Correlated array of the item's tag ids, for RETURNING clauses."""
+    return (
+        select(func.array_agg(item_tag.c.tag_id))
+        .where(item_tag.c.item_id == Items.id)
+        .scalar_subquery()
+        .label("tag_ids")
+    )
 
 
 class ItemRepository(BaseRepository):
 
+    async def _track(self, user_id: int, delta: StatsDelta) -> None:
+        await StatsRepository(self.session).apply(user_id, delta)
+
+    @staticmethod
+    def _locked_old_values(where, names: Sequence[str]):
+        """CTE locking the matched rows and capturing their current values."""
+        return (
+            select(Items.id, *(getattr(Items, name) for name in names))
+            .where(*where)
+            .with_for_update()
+            .cte("old")
+        )
+
+    @staticmethod
+    def _changes_delta(row, names: Sequence[str]) -> StatsDelta:
+        delta = StatsDelta()
+        for name in names:
+            before, after = row._mapping[f"old_{name}"], row._mapping[name]
+            if before != after:
+                delta[name, before.value] -= 1
+                delta[name, after.value] += 1
+        return delta
+
     async def create(self, user_id: int, data) -> Items:
+        self._mark_changed(user_id)
+        tag_ids = data.pop("tag_ids", None)
         item = Items(user_id=user_id, **data)
+        item.tags = []
+        if tag_ids:
+            result = await self.session.execute(
+                select(Tags).where(Tags.user_id == user_id, Tags.id.in_(tag_ids))
+            )
+            item.tags = list(result.scalars().all())
         self.session.add(item)
         await self.session.flush()
+        await self._track(user_id, item_delta(
+            item.status, item.kind, item.priority, [tag.id for tag in item.tags]
+        ))
         return item
 
+    async def bulk_create(self, user_id: int, rows: Sequence[dict]) -> int:
+        """Insert already validated rows with multi-row INSERT statements.
+
+        Each row may carry ``tag_ids`` that must already belong to the user.
+        """
+        if not rows:
+            return 0
+        self._mark_changed(user_id)
+
+        values = []
+        for row in rows:
+            values.append({
+                key: value for key, value in row.items() if key != "tag_ids"
+            })
+            values[-1]["user_id"] = user_id
+
+        # Core insert on the table skips ORM bulk bookkeeping; SQLAlchemy
+        # batches it into multi-row INSERT ... RETURNING statements.
+        table = Items.__table__
+        result = await self.session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            values,
+        )
+        item_ids = result.scalars().all()
+
+        links = [
+            {"item_id": item_id, "tag_id": tag_id}
+            for item_id, row in zip(item_ids, rows)
+            for tag_id in set(row.get("tag_ids") or ())
+        ]
+        if links:
+            await self.session.execute(insert(item_tag), links)
+
+        delta = StatsDelta()
+        for value in values:
+            delta.update(item_delta(
+                value["status"], value["kind"], value["priority"]
+            ))
+        delta.update(tags_delta(link["tag_id"] for link in links))
+        await self._track(user_id, delta)
+        return len(item_ids)
+
     async def get(self, item_id: int, user_id: int) -> Optional[Items]:
         stmt = (
             select(Items)
@@ -23,28 +216,31 @@ class ItemRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.unique().scalar_one_or_none()
 
-    async def list(
-        self,
+    async def get_updated_at(
+        self, item_id: int, user_id: int
+    ) -> Optional[datetime]:
+        stmt = select(Items.updated_at).where(
+            Items.id == item_id, Items.user_id == user_id
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _filtered(
+        stmt: Select,
         user_id: int,
         *,
         status: Optional[str] = None,
         kind: Optional[str] = None,
         priority: Optional[str] = None,
         tags_any: Optional[list[int]] = None,
+        tags_all: Optional[list[int]] = None,
+        tags_none: Optional[list[int]] = None,
         title_substring: Optional[str] = None,
         created_from: Optional[str] = None,
         created_to: Optional[str] = None,
-        sort_by: str = "created_at",
-        sort_dir: str = "desc",
-        limit: int = 20,
-        offset: int = 0
-    ) -> Sequence[Items]:
-
-        stmt = (
-            select(Items)
-            .where(Items.user_id == user_id)
-            .options(joinedload(Items.tags))
-        )
+    ) -> Select:
+        stmt = stmt.where(Items.user_id == user_id)
 
         if status:
             stmt = stmt.where(Items.status == status)
@@ -65,15 +261,231 @@ class ItemRepository(BaseRepository):
             stmt = stmt.where(Items.created_at <= created_to)
 
         if tags_any:
-            stmt = stmt.join(Items.tags).where(Tags.id.in_(tags_any))
+            stmt = stmt.where(tagged_with(tags_any))
+
+        if tags_all:
+            stmt = stmt.where(tagged_with_all(tags_all))
+
+        if tags_none:
+            stmt = stmt.where(~tagged_with(tags_none))
+
+        return stmt
+
+    def _bounded_count(self, user_id: int, limit: int, filters: dict) -> Select:
+        """``count(*)`` of the matching items, stopping after ``limit`` rows."""
+        matched = self._filtered(select(Items.id), user_id, **filters).limit(limit)
+        return select(func.count()).select_from(matched.subquery())
+
+    async def list(
+        self,
+        user_id: int,
+        *,
+        sort_by: str = "created_at",
+        sort_dir: str = "desc",
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        count_limit: Optional[int] = None,
+        **filters,
+    ) -> Sequence[Items] | List[dict]:
+        """Items of a page, or plain dicts when ``fields`` is given.
+
+        A projection selects only the requested columns (plus id and the
+        sort column for the cursor) and loads tags only when asked for.
+        ``filters`` are the keyword arguments of ``_filtered``.
+
+        With ``count_limit`` the page comes back as ``(rows, count)``:
+        the matching items are counted, up to ``count_limit``, in the same
+        statement. ``count`` is None when the page is empty.
+        """
+        if fields is None:
+            stmt = select(Items).options(selectinload(Items.tags))
+        else:
+            names = {"id", sort_by, *fields}
+            stmt = select(*(
+                column for column in Items.__table__.columns
+                if column.key in names
+            ))
+        stmt = self._filtered(stmt, user_id, **filters)
+
+        if count_limit is not None:
+            counted = self._bounded_count(user_id, count_limit, filters).cte("counted")
+            stmt = stmt.add_columns(
+                select(counted.c.count).scalar_subquery().label("total")
+            )
 
         field = getattr(Items, sort_by)
-        stmt = stmt.order_by(desc(field) if sort_dir == "desc" else asc(field))
+        descending = sort_dir == "desc"
+        order = desc if descending else asc
+        stmt = stmt.order_by(order(field), order(Items.id))
+
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get("k") != sort_by or payload.get("d") != sort_dir:
+                raise InvalidCursorError("Cursor does not match the ordering")
+            if not isinstance(payload.get("id"), int):
+                raise InvalidCursorError("Malformed cursor")
+            value = load_value(field, payload.get("v"))
+            stmt = stmt.where(
+                keyset_condition(field, Items.id, value, payload["id"], descending)
+            )
+        else:
+            stmt = stmt.offset(offset)
 
-        stmt = stmt.limit(limit).offset(offset)
+        stmt = stmt.limit(limit)
 
         result = await self.session.execute(stmt)
-        return result.scalars().unique().all()
+        rows = result.all()
+        if fields is None:
+            items = [row[0] for row in rows]
+        else:
+            items = [
+                {name: value for name, value in row._mapping.items() if name != "total"}
+                for row in rows
+            ]
+            if "tags" in fields:
+                await self._attach_tags(items)
+
+        if count_limit is None:
+            return items
+        return items, (rows[0].total if rows else None)
+
+    async def list_with_total(
+        self, user_id: int, *, exact_limit: int, **query
+    ) -> Tuple[Sequence[Items] | List[dict], int, bool]:
+        """A page, the number of matching items and whether it is exact.
+
+        Up to ``exact_limit`` matches are counted in the page statement
+        itself. Beyond that the count is the planner's row estimate, which
+        costs an ``EXPLAIN`` instead of a scan of every match.
+        """
+        items, total = await self.list(
+            user_id, count_limit=exact_limit + 1, **query
+        )
+        filters = {
+            name: value for name, value in query.items() if name in FILTERS
+        }
+        if total is None and not (query.get("offset") or query.get("cursor")):
+            total = 0
+        elif total is None:
+            # Past the last page: the count has to be taken on its own.
+            result = await self.session.execute(
+                self._bounded_count(user_id, exact_limit + 1, filters)
+            )
+            total = result.scalar_one()
+        if total <= exact_limit:
+            return items, total, True
+        estimate = await estimate_count(
+            self.session, self._filtered(select(Items.id), user_id, **filters)
+        )
+        return items, max(estimate, total), False
+
+    async def _attach_tags(self, rows: List[dict]) -> None:
+        by_id = {row["id"]: row for row in rows}
+        for row in rows:
+            row["tags"] = []
+        if not rows:
+            return
+        stmt = (
+            select(item_tag.c.item_id, Tags.id, Tags.name)
+            .join(Tags, Tags.id == item_tag.c.tag_id)
+            .where(item_tag.c.item_id == any_of(by_id))
+            .order_by(item_tag.c.item_id, Tags.id)
+        )
+        result = await self.session.execute(stmt)
+        for item_id, tag_id, name in result:
+            by_id[item_id]["tags"].append({"id": tag_id, "name": name})
+
+    async def search(
+        self,
+        user_id: int,
+        text: str,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Sequence[Row]:
+        tsquery = prefix_tsquery(text)
+        if tsquery is None:
+            return []
+
+        query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        rank = func.ts_rank_cd(Items.search_vector, query)
+
+        # Rank and paginate on the index alone; snippets are only built
+        # for the rows that make it into the page.
+        ranked = (
+            select(Items.id, rank.label("rank"))
+            .where(
+                Items.user_id == user_id,
+                Items.search_vector.bool_op("@@")(query),
+            )
+            .order_by(rank.desc(), Items.id)
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+
+        stmt = (
+            select(
+                Items,
+                ranked.c.rank,
+                func.ts_headline(
+                    SEARCH_CONFIG, Items.title, query, "HighlightAll=true"
+                ).label("title_highlight"),
+                func.ts_headline(
+                    SEARCH_CONFIG, Items.notes, query, HEADLINE_OPTIONS
+                ).label("notes_highlight"),
+            )
+            .join(ranked, ranked.c.id == Items.id)
+            .options(selectinload(Items.tags))
+            .order_by(ranked.c.rank.desc(), Items.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def stream_export(
+        self, user_id: int, *, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield the user's items in batches through a server-side cursor."""
+        tag_names = (
+            select(func.array_agg(Tags.name))
+            .join(item_tag, item_tag.c.tag_id == Tags.id)
+            .where(item_tag.c.item_id == Items.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                Items.id,
+                Items.title,
+                Items.kind,
+                Items.status,
+                Items.priority,
+                Items.notes,
+                Items.created_at,
+                Items.updated_at,
+                tag_names.label("tags"),
+            )
+            .where(Items.user_id == user_id)
+            .order_by(Items.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def make_cursor(item: Items | dict, sort_by: str, sort_dir: str) -> str:
+        if isinstance(item, dict):
+            value, item_id = item[sort_by], item["id"]
+        else:
+            value, item_id = getattr(item, sort_by), item.id
+        return encode_cursor({
+            "k": sort_by,
+            "d": sort_dir,
+            "v": dump_value(value),
+            "id": item_id,
+        })
 
     async def update(
             self,
@@ -81,42 +493,208 @@ class ItemRepository(BaseRepository):
             user_id: int,
             data: dict,
             tag_ids: Optional[List[int]] = None,
-    ) -> Optional[Items]:
+    ) -> Optional[dict]:
+        """Update an owned item and return its new representation.
+
+        Ownership check, column update, tag diff and the final read all
+        happen in one statement: data-modifying CTEs insert and delete
+        only the ``item_tag`` rows that actually change. The stats delta
+        is applied with a second statement.
+        """
+        self._mark_changed(user_id)
+        table = Items.__table__
+        tracked = [name for name in ITEM_DIMENSIONS if name in data]
+        old = self._locked_old_values(
+            (Items.id == item_id, Items.user_id == user_id), tracked
+        )
+        upd = (
+            update(table)
+            .where(table.c.id == old.c.id)
+            .values(**data, updated_at=utcnow())
+            .returning(
+                *(table.c[name] for name in ITEM_COLUMNS),
+                *(old.c[name].label(f"old_{name}") for name in tracked),
+            )
+            .cte("upd")
+        )
+        columns = [upd]
+
+        if tag_ids is None:
+            tag_id, tag_name = Tags.id, Tags.name
+            tags = (
+                select()
+                .select_from(Tags)
+                .join(item_tag, item_tag.c.tag_id == Tags.id)
+                .where(item_tag.c.item_id == upd.c.id)
+            )
+        else:
+            wanted = (
+                select(Tags.id, Tags.name)
+                .where(Tags.user_id == user_id, Tags.id == any_of(tag_ids))
+                .cte("wanted")
+            )
+            removed = (
+                delete(item_tag)
+                .where(
+                    item_tag.c.item_id == old.c.id,
+                    item_tag.c.tag_id.not_in(select(wanted.c.id)),
+                )
+                .returning(item_tag.c.tag_id)
+                .cte("removed")
+            )
+            current = select(item_tag.c.tag_id).where(
+                item_tag.c.item_id == old.c.id
+            )
+            added = (
+                InsertIgnoring(item_tag)
+                .from_select(
+                    ["item_id", "tag_id"],
+                    select(old.c.id, wanted.c.id)
+                    .join(wanted, true())
+                    .where(wanted.c.id.not_in(current)),
+                )
+                .returning(item_tag.c.tag_id)
+                .cte("added")
+            )
+            tag_id, tag_name = wanted.c.id, wanted.c.name
+            tags = select().select_from(wanted)
+            columns += [
+                select(func.array_agg(added.c.tag_id))
+                .scalar_subquery().label("added_tag_ids"),
+                select(func.array_agg(removed.c.tag_id))
+                .scalar_subquery().label("removed_tag_ids"),
+            ]
+
+        columns += [
+            tags.add_columns(
+                func.array_agg(aggregate_order_by(column, tag_id))
+            ).scalar_subquery().label(label)
+            for column, label in ((tag_id, "tag_ids"), (tag_name, "tag_names"))
+        ]
+        result = await self.session.execute(select(*columns))
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        delta = self._changes_delta(row, tracked)
+        if tag_ids is not None:
+            delta.update(tags_delta(
+                row.added_tag_ids or (), row.removed_tag_ids or ()
+            ))
+        await self._track(user_id, delta)
+        return {
+            **{name: row._mapping[name] for name in ITEM_COLUMNS},
+            "tags": [
+                {"id": tag_id, "name": name}
+                for tag_id, name in zip(row.tag_ids or (), row.tag_names or ())
+            ],
+        }
+
+    async def delete(self, item_id: int, user_id: int) -> bool:
+        self._mark_changed(user_id)
         stmt = (
-            update(Items)
+            delete(Items)
             .where(Items.id == item_id, Items.user_id == user_id)
-            .values(**data)
-            .returning(Items)
+            .returning(
+                Items.status, Items.kind, Items.priority, tag_ids_of_item()
+            )
         )
         result = await self.session.execute(stmt)
-        item = result.scalar_one_or_none()
+        row = result.one_or_none()
+        if row is None:
+            return False
+        await self._track(user_id, item_delta(*row, sign=-1))
+        return True
 
-        if not item:
-            return None
+    async def batch_update(
+        self,
+        item_ids: Sequence[int],
+        user_id: int,
+        data: dict,
+        add_tag_ids: Optional[Sequence[int]] = None,
+        remove_tag_ids: Optional[Sequence[int]] = None,
+    ) -> List[int]:
+        self._mark_changed(user_id)
+        owned = (Items.id == any_of(item_ids), Items.user_id == user_id)
+        tracked = [name for name in ITEM_DIMENSIONS if name in data]
+        old = self._locked_old_values(owned, tracked)
+        stmt = (
+            update(Items)
+            .where(Items.id == old.c.id)
+            .values(**data, updated_at=utcnow())
+            .returning(
+                Items.id,
+                *(getattr(Items, name) for name in tracked),
+                *(old.c[name].label(f"old_{name}") for name in tracked),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        rows = result.all()
+        affected = [row.id for row in rows]
+        if not affected:
+            return affected
 
-        if tag_ids is not None:
-            from sqlalchemy import select
-            from src.database.models import Tags
+        delta = StatsDelta()
+        for row in rows:
+            delta.update(self._changes_delta(row, tracked))
 
-            tags_stmt = (
-                select(Tags)
-                .where(Tags.id.in_(tag_ids), Tags.user_id == user_id)
+        if remove_tag_ids:
+            result = await self.session.execute(
+                delete(item_tag)
+                .where(
+                    item_tag.c.item_id == any_of(affected),
+                    item_tag.c.tag_id == any_of(remove_tag_ids),
+                )
+                .returning(item_tag.c.tag_id)
             )
-            tags_result = await self.session.execute(tags_stmt)
-            tags = tags_result.scalars().all()
-            item.tags = tags
+            delta.update(tags_delta(removed=result.scalars().all()))
 
-        await self.session.flush()
-        await self.session.refresh(item)
-        return item
+        if add_tag_ids:
+            pairs = (
+                select(Items.id, Tags.id)
+                .join(Tags, true())
+                .where(
+                    Items.id == any_of(affected),
+                    Tags.id == any_of(add_tag_ids),
+                    Tags.user_id == user_id,
+                )
+            )
+            result = await self.session.execute(
+                InsertIgnoring(item_tag)
+                .from_select(["item_id", "tag_id"], pairs)
+                .returning(item_tag.c.tag_id)
+            )
+            delta.update(tags_delta(added=result.scalars().all()))
 
-    async def delete(self, item_id: int, user_id: int) -> bool:
-        stmt = delete(Items).where(
-            Items.id == item_id,
-            Items.user_id == user_id
+        await self._track(user_id, delta)
+        return affected
+
+    async def batch_delete(
+        self, item_ids: Sequence[int], user_id: int
+    ) -> List[int]:
+        self._mark_changed(user_id)
+        stmt = (
+            delete(Items)
+            .where(Items.id == any_of(item_ids), Items.user_id == user_id)
+            .returning(
+                Items.id,
+                Items.status,
+                Items.kind,
+                Items.priority,
+                tag_ids_of_item(),
+            )
+            .execution_options(synchronize_session=False)
         )
         result = await self.session.execute(stmt)
-        return result.rowcount > 0
+        rows = result.all()
+        delta = StatsDelta()
+        for row in rows:
+            delta.update(item_delta(
+                row.status, row.kind, row.priority, row.tag_ids, sign=-1
+            ))
+        await self._track(user_id, delta)
+        return [row.id for row in rows]
 
     async def update_tags(
             self, item_id: int, user_id: int, tag_ids: List[int]
@@ -124,6 +702,7 @@ class ItemRepository(BaseRepository):
         item = await self.get(item_id, user_id)
         if item is None:
             return None
+        self._mark_changed(user_id)
 
         stmt = select(Tags).where(
             Tags.user_id == user_id,
@@ -132,7 +711,12 @@ class ItemRepository(BaseRepository):
         result = await self.session.execute(stmt)
         tags = result.scalars().all()
 
+        old_tag_ids = {tag.id for tag in item.tags}
+        new_tag_ids = {tag.id for tag in tags}
         item.tags = tags
+        await self._track(user_id, tags_delta(
+            new_tag_ids - old_tag_ids, old_tag_ids - new_tag_ids
+        ))
         await self.session.flush()
 
         return item
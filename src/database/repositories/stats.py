@@ -0,0 +1,161 @@
+from collections import Counter
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import (
+    Integer,
+    Row,
+    String,
+    and_,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+    true,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.database.models import Tags, item_stats
+from src.database.repositories.base import BaseRepository
+
+
+StatsDelta = Counter
+
+ITEM_DIMENSIONS = ("status", "kind", "priority")
+
+# First key of the (namespace, user_id) advisory lock that serializes a
+# user's counter updates with a rebuild of that user.
+STATS_LOCK_NAMESPACE = 7001
+
+REBUILD_SQL = """
+INSERT INTO item_stats (user_id, dimension, value, count)
+SELECT user_id, 'total', '', count(*)
+FROM items {where} GROUP BY user_id
+UNION ALL
+SELECT user_id, 'status', status::text, count(*)
+FROM items {where} GROUP BY user_id, status
+UNION ALL
+SELECT user_id, 'kind', kind::text, count(*)
+FROM items {where} GROUP BY user_id, kind
+UNION ALL
+SELECT user_id, 'priority', priority::text, count(*)
+FROM items {where} GROUP BY user_id, priority
+UNION ALL
+SELECT items.user_id, 'tag', item_tag.tag_id::text, count(*)
+FROM item_tag JOIN items ON items.id = item_tag.item_id
+{where} GROUP BY items.user_id, item_tag.tag_id
+"""
+
+
+def _value(value) -> str:
+    return str(getattr(value, "value", value))
+
+
+def item_delta(
+    status,
+    kind,
+    priority,
+    tag_ids: Iterable[int] = (),
+    sign: int = 1,
+) -> StatsDelta:
+    """Counter changes caused by adding (sign=1) or removing (-1) an item."""
+    delta = StatsDelta({
+        ("total", ""): sign,
+        ("status", _value(status)): sign,
+        ("kind", _value(kind)): sign,
+        ("priority", _value(priority)): sign,
+    })
+    for tag_id in tag_ids or ():
+        delta["tag", str(tag_id)] += sign
+    return delta
+
+
+def tags_delta(added: Iterable[int] = (), removed: Iterable[int] = ()) -> StatsDelta:
+    delta = StatsDelta()
+    for tag_id in added:
+        delta["tag", str(tag_id)] += 1
+    for tag_id in removed:
+        delta["tag", str(tag_id)] -= 1
+    return delta
+
+
+class StatsRepository(BaseRepository):
+
+    async def apply(self, user_id: int, delta: StatsDelta) -> None:
+        # Sorted so concurrent writers lock counter rows in the same order.
+        rows = [
+            (dimension, value, n)
+            for (dimension, value), n in sorted(delta.items())
+            if n
+        ]
+        if not rows:
+            return
+        # The user's rebuild lock is taken by the same statement, before
+        # any counter row is touched, so it costs no extra round-trip.
+        locked = select(
+            func.pg_advisory_xact_lock(STATS_LOCK_NAMESPACE, user_id)
+        ).cte("locked")
+        changes = values(
+            column("dimension", String),
+            column("value", String),
+            column("count", Integer),
+            name="changes",
+        ).data(rows)
+        stmt = pg_insert(item_stats).from_select(
+            ["user_id", "dimension", "value", "count"],
+            select(
+                literal(user_id), changes.c.dimension, changes.c.value,
+                changes.c["count"],
+            ).join_from(changes, locked, true()),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "dimension", "value"],
+            set_={"count": item_stats.c.count + stmt.excluded["count"]},
+        )
+        await self.session.execute(stmt)
+
+    async def get(self, user_id: int) -> Sequence[Row]:
+        stmt = (
+            select(
+                item_stats.c.dimension,
+                item_stats.c.value,
+                item_stats.c.count,
+                Tags.name,
+            )
+            .outerjoin(
+                Tags,
+                and_(
+                    item_stats.c.dimension == "tag",
+                    Tags.user_id == item_stats.c.user_id,
+                    cast(Tags.id, String) == item_stats.c.value,
+                ),
+            )
+            .where(item_stats.c.user_id == user_id, item_stats.c.count != 0)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def rebuild(self, user_id: Optional[int] = None) -> None:
+        """Recompute counters from items and item_tag, repairing any drift."""
+        # Blocks counter updates until commit, so writes racing the rebuild
+        # are either part of its snapshot or applied on top of it. A single
+        # user only waits for (and holds up) that user's writers.
+        stmt = delete(item_stats)
+        where = ""
+        params = {}
+        if user_id is None:
+            await self.session.execute(
+                text("LOCK TABLE item_stats IN SHARE ROW EXCLUSIVE MODE")
+            )
+        else:
+            await self.session.execute(
+                select(func.pg_advisory_xact_lock(STATS_LOCK_NAMESPACE, user_id))
+            )
+            stmt = stmt.where(item_stats.c.user_id == user_id)
+            where = "WHERE items.user_id = :user_id"
+            params["user_id"] = user_id
+        await self.session.execute(stmt)
+        await self.session.execute(text(REBUILD_SQL.format(where=where)), params)
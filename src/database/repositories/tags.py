@@ -1,5 +1,25 @@
-from sqlalchemy import select
-from src.database.models import Tags
+from typing import List, Optional, Sequence
+
+from sqlalchemy import (
+    String,
+    any_,
+    false,
+    func,
+    literal,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+
+from src.database.models import Tags, item_tag
+from src.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    escape_like,
+    keyset_condition,
+)
 from src.database.repositories.base import BaseRepository
 
 
@@ -11,12 +31,121 @@ class TagRepository(BaseRepository):
         return result.scalar_one_or_none()
     
     async def create(self, user_id: int, name: str) -> Tags:
+        self._mark_changed(user_id)
         tag = Tags(user_id=user_id, name=name)
         self.session.add(tag)
         await self.session.flush()
         return tag
 
-    async def list(self, user_id: int):
-        stmt = select(Tags).where(Tags.user_id == user_id)
+    async def upsert_many(
+        self, user_id: int, names: Sequence[str]
+    ) -> List[dict]:
+        """Ids for every name, creating the missing tags, in one statement.
+
+        Returns ``{"id", "name", "created"}`` dicts in the order of
+        ``names`` (duplicates collapsed). Inserts run in name order so
+        concurrent batches lock the unique index in the same order.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        table = Tags.__table__
+        names_param = literal(names, ARRAY(String))
+        requested = select(func.unnest(names_param).label("name")).subquery()
+        inserted = (
+            pg_insert(table)
+            .from_select(
+                ["user_id", "name"],
+                select(literal(user_id), requested.c.name)
+                .order_by(requested.c.name),
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "name"])
+            .returning(table.c.id, table.c.name)
+            .cte("inserted")
+        )
+        # Both branches read the same snapshot, so the existing branch
+        # never sees the rows inserted next to it.
+        stmt = union_all(
+            select(inserted.c.id, inserted.c.name, true().label("created")),
+            select(table.c.id, table.c.name, false()).where(
+                table.c.user_id == user_id, table.c.name == any_(names_param)
+            ),
+        )
+        result = await self.session.execute(stmt)
+        by_name = {row.name: dict(row._mapping) for row in result}
+
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            # Committed by a concurrent batch after our snapshot was taken.
+            result = await self.session.execute(
+                select(table.c.id, table.c.name).where(
+                    table.c.user_id == user_id,
+                    table.c.name == any_(literal(missing, ARRAY(String))),
+                )
+            )
+            for row in result:
+                by_name[row.name] = {**row._mapping, "created": False}
+
+        if any(row["created"] for row in by_name.values()):
+            self._mark_changed(user_id)
+        return [by_name[name] for name in names]
+
+    async def list_ids(self, user_id: int) -> set[int]:
+        stmt = select(Tags.id).where(Tags.user_id == user_id)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return set(result.scalars().all())
+
+    async def list(
+        self,
+        user_id: int,
+        *,
+        prefix: Optional[str] = None,
+        counts: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Sequence[Tags] | List[dict]:
+        """The user's tags ordered by name, optionally with item counts.
+
+        ``prefix`` is matched with LIKE on the text_pattern_ops index. With
+        ``counts`` the page of tags is picked first and only its item_tag
+        rows are aggregated, in the same statement.
+        """
+        stmt = select(Tags.id, Tags.name) if counts else select(Tags)
+        stmt = stmt.where(Tags.user_id == user_id)
+        if prefix:
+            stmt = stmt.where(
+                Tags.name.like(escape_like(prefix) + "%", escape="\\")
+            )
+        if cursor:
+            payload = decode_cursor(cursor)
+            name, tag_id = payload.get("v"), payload.get("id")
+            if not isinstance(name, str) or not isinstance(tag_id, int):
+                raise InvalidCursorError("Malformed cursor")
+            stmt = stmt.where(
+                keyset_condition(Tags.name, Tags.id, name, tag_id, False)
+            )
+        stmt = stmt.order_by(Tags.name, Tags.id).limit(limit)
+
+        if not counts:
+            result = await self.session.execute(stmt)
+            return result.scalars().all()
+
+        page = stmt.subquery()
+        stmt = (
+            select(
+                page.c.id,
+                page.c.name,
+                func.count(item_tag.c.item_id).label("count"),
+            )
+            .outerjoin(item_tag, item_tag.c.tag_id == page.c.id)
+            .group_by(page.c.id, page.c.name)
+            .order_by(page.c.name, page.c.id)
+        )
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    def make_cursor(tag: Tags | dict) -> str:
+        if isinstance(tag, dict):
+            return encode_cursor({"v": tag["name"], "id": tag["id"]})
+        return encode_cursor({"v": tag.name, "id": tag.id})
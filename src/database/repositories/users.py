@@ -1,12 +1,41 @@
 from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import USERS_SCOPE
+from src.database.connection import mark_changed, mark_user_changed
 from src.database.models import Users
+from src.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    dump_value,
+    encode_cursor,
+    escape_like,
+    keyset_condition,
+    load_value,
+)
 from src.schemas.users import UserCreate, UserUpdate
 
 
+def _filtered(
+    stmt: Select,
+    email_prefix: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Select:
+    if email_prefix:
+        stmt = stmt.where(
+            Users.email.like(escape_like(email_prefix) + "%", escape="\\")
+        )
+    if created_from:
+        stmt = stmt.where(Users.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(Users.created_at <= created_to)
+    return stmt
+
+
 class UserRepository:
     @staticmethod
     async def get_by_id(session: AsyncSession, user_id: int) -> Users | None:
@@ -14,12 +43,60 @@ class UserRepository:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_all(session: AsyncSession) -> list[Users]:
-        result = await session.execute(select(Users))
-        return list(result.scalars().all())
+    async def list(
+        session: AsyncSession,
+        *,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Sequence[Users]:
+        """A page of users by signup time; ``filters`` go to ``_filtered``.
+
+        ``(created_at, id)`` is the order of ix_users_created_at, so the
+        created_at range and the keyset are both served by that index.
+        """
+        stmt = _filtered(select(Users), **filters)
+        if cursor:
+            payload = decode_cursor(cursor)
+            last_id = payload.get("id")
+            if not isinstance(last_id, int) or payload.get("v") is None:
+                raise InvalidCursorError("Malformed cursor")
+            created_at = load_value(Users.created_at, payload["v"])
+            stmt = stmt.where(
+                keyset_condition(
+                    Users.created_at, Users.id, created_at, last_id, False
+                )
+            )
+        stmt = stmt.order_by(Users.created_at, Users.id).limit(limit)
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    def make_cursor(user: Users) -> str:
+        return encode_cursor({"v": dump_value(user.created_at), "id": user.id})
+
+    @staticmethod
+    async def stream(
+        session: AsyncSession, *, batch_size: int = 1000, **filters
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield matching users in batches through a server-side cursor."""
+        stmt = (
+            _filtered(
+                select(
+                    Users.id, Users.email, Users.display_name, Users.created_at
+                ),
+                **filters,
+            )
+            .order_by(Users.created_at, Users.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
     
     @staticmethod
     async def create(session: AsyncSession, data: UserCreate) -> Users:
+        mark_changed(session, USERS_SCOPE)
         user: Users = Users(
             email=data.email,
             display_name=data.display_name,
@@ -31,6 +108,8 @@ class UserRepository:
 
     @staticmethod
     async def update(session: AsyncSession, user: Users, data: UserUpdate) -> Users:
+        mark_changed(session, USERS_SCOPE)
+        mark_user_changed(session, user.id)
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(user, field, value)
         await session.flush()
@@ -39,4 +118,6 @@ class UserRepository:
 
     @staticmethod
     async def delete(session: AsyncSession, user: Users) -> None:
+        mark_changed(session, USERS_SCOPE)
+        mark_user_changed(session, user.id)
         await session.delete(user)
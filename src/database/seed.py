@@ -3,7 +3,13 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import select
 
-from src.database.connection import DatabaseConnection
+from src.core.cache import USERS_SCOPE
+from src.database.connection import (
+    DatabaseConnection,
+    mark_changed,
+    mark_user_changed,
+)
+from src.database.repositories import StatsRepository
 from src.database.models import (
     Users, Tags, Items,
     KindEnum, StatusEnum, PriorityEnum
@@ -33,6 +39,10 @@ async def run_seed() -> bool:
 
         db.add_all([user1, user2])
         await db.flush()
+        # Listings may already be cached (empty) under the current versions.
+        mark_changed(db, USERS_SCOPE)
+        mark_user_changed(db, user1.id)
+        mark_user_changed(db, user2.id)
 
         # User 1 tags
         t_u1_reading = Tags(user_id=user1.id, name="reading")
@@ -120,6 +130,8 @@ async def run_seed() -> bool:
         ]
 
         db.add_all(items)
+        await db.flush()
+        await StatsRepository(db).rebuild()
 
         return True
 
@@ -1,14 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 
+from src.core import settings
+from src.core.jobs import jobs
+from src.core.metrics import MetricsMiddleware, monitor_event_loop_lag
+from src.core.query_stats import QueryStatsMiddleware
 from src.routers.api.v1 import (
     admin_router,
     items_router,
+    metrics_router,
     tags_router,
     users_router,
 )
 
-app = FastAPI(docs_url="/swagger")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await jobs.start()
+    lag_monitor = None
+    if settings.app.metrics_enabled:
+        lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    yield
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+        with suppress(asyncio.CancelledError):
+            await lag_monitor
+    await jobs.stop()
+
+
+app = FastAPI(docs_url="/swagger", lifespan=lifespan)
+
+if settings.app.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+# Added last so it wraps the metrics middleware and shares its RequestStats.
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(admin_router)
 app.include_router(items_router)
@@ -1,4 +1,5 @@
 from .admin import router as admin_router
 from .items import router as items_router
+from .metrics import router as metrics_router
 from .tags import router as tags_router
 from .users import router as users_router
\ No newline at end of file
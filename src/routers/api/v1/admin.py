@@ -1,17 +1,114 @@
-from fastapi import APIRouter, HTTPException
-import os
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 
+from src.core.jobs import Job, JobQueueFull, jobs
+from src.database.connection import DatabaseConnection
+from src.database.generate import GenerateParams, run_generate
+from src.database.rebuild_stats import run_rebuild_stats
 from src.database.seed import run_seed
+from src.schemas.admin import (
+    JobCreate,
+    JobKind,
+    JobOut,
+    RebuildStatsParams,
+    SeedParams,
+    SeedResult,
+)
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
-@router.post("/seed")
-async def admin_seed():
-    result = await run_seed()
+async def _seed_job(job: Job) -> dict:
+    # Without params only the small demo dataset is inserted (once).
+    if job.params:
+        result = await run_generate(
+            GenerateParams(**job.params), on_progress=job.report_progress
+        )
+        return {
+            "status": "ok",
+            "message": "Data generated",
+            "result": SeedResult.model_validate(
+                result, from_attributes=True
+            ).model_dump(),
+        }
 
-    if not result:
+    if not await run_seed():
         return {"status": "skipped", "message": "Data already exists"}
 
     return {"status": "ok", "message": "Seed completed"}
+
+
+async def _rebuild_stats_job(job: Job) -> dict:
+    await run_rebuild_stats(job.params["user_id"])
+    return {"status": "ok", "message": "Stats rebuilt"}
+
+
+jobs.register(JobKind.seed, _seed_job)
+jobs.register(JobKind.rebuild_stats, _rebuild_stats_job)
+
+
+def _submit(response: Response, kind: JobKind, params: BaseModel | None) -> Job:
+    try:
+        job = jobs.submit(kind, params.model_dump() if params else {})
+    except JobQueueFull as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "5"})
+    response.headers["Location"] = router.url_path_for(
+        "get_job", job_id=job.id
+    )
+    return job
+
+
+@router.post("/jobs", response_model=JobOut, status_code=202)
+async def submit_job(payload: JobCreate, response: Response):
+    params = None
+    # An empty seed job runs the demo seed rather than the generator.
+    if payload.params or payload.kind is not JobKind.seed:
+        model = SeedParams if payload.kind is JobKind.seed else RebuildStatsParams
+        try:
+            params = model.model_validate(payload.params)
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", "params", *error["loc"])}
+                for error in e.errors()
+            ])
+    return _submit(response, payload.kind, params)
+
+
+@router.get("/jobs", response_model=list[JobOut])
+async def list_jobs():
+    return jobs.list()
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.delete("/jobs/{job_id}", response_model=JobOut, status_code=202)
+async def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.post("/seed", response_model=JobOut, status_code=202)
+async def admin_seed(response: Response, params: SeedParams | None = None):
+    return _submit(response, JobKind.seed, params)
+
+
+@router.post("/stats/rebuild", response_model=JobOut, status_code=202)
+async def admin_rebuild_stats(response: Response, user_id: int | None = None):
+    return _submit(
+        response, JobKind.rebuild_stats, RebuildStatsParams(user_id=user_id)
+    )
+
+
+@router.get("/pool")
+async def admin_pool_stats():
+    return DatabaseConnection.pool_stats()
@@ -1,18 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import csv
+import io
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.dependencies import get_db_session
-from src.database.repositories import ItemRepository
-from src.schemas.items import ItemCreate, ItemOut, ItemSortFields, ItemUpdate
+from src.core import ndjson
+from src.core.cache import cache_key, get_response, set_response, user_scope
+from src.core.etag import (
+    is_not_modified,
+    make_etag,
+    not_modified,
+    validator_headers,
+)
+from src.core.settings import settings
+from src.database.connection import DatabaseConnection
+from src.database.dependencies import get_db_session, get_db_user_read_session
+from src.database.pagination import InvalidCursorError
+from src.database.repositories import ItemRepository, TagRepository
+from src.schemas.items import (
+    ExportFormat,
+    ItemBatchDelete,
+    ItemBatchResult,
+    ItemBatchUpdate,
+    ItemCreate,
+    ItemFields,
+    ItemImportError,
+    ItemImportResult,
+    ItemOut,
+    ItemSearchHit,
+    ItemSortFields,
+    ItemUpdate,
+)
 from src.database.models import StatusEnum, KindEnum, PriorityEnum
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+ITEM_LIST = TypeAdapter(list[ItemOut])
+PARTIAL_ITEM_LIST = TypeAdapter(list[dict[str, Any]])
+
+EXPORT_COLUMNS = [
+    "id", "title", "kind", "status", "priority",
+    "notes", "created_at", "updated_at", "tags",
+]
+
 
 @router.post("/", response_model=ItemOut)
 async def create_item(
     payload: ItemCreate,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session, scope="function"),
     user_id: int = Query(...),
 ):
     repo = ItemRepository(session)
@@ -20,71 +61,311 @@ async def create_item(
     return item
 
 
+@router.post("/import", response_model=ItemImportResult)
+async def import_items(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session, scope="function"),
+    user_id: int = Query(...),
+):
+    repo = ItemRepository(session)
+    known_tags = await TagRepository(session).list_ids(user_id)
+    report = ItemImportResult()
+    chunk: list[dict] = []
+
+    def reject(line_number: int, errors: list[str]) -> None:
+        report.failed += 1
+        if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(ItemImportError(line=line_number, errors=errors))
+
+    async for line_number, line in ndjson.iter_lines(request.stream()):
+        try:
+            row = ItemCreate.model_validate_json(line)
+        except ValidationError as e:
+            reject(line_number, [
+                f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            ])
+            continue
+
+        unknown = set(row.tag_ids or ()) - known_tags
+        if unknown:
+            reject(line_number, [f"tag_ids: unknown tags {sorted(unknown)}"])
+            continue
+
+        chunk.append(row.model_dump())
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            report.inserted += await repo.bulk_create(user_id, chunk)
+            chunk = []
+
+    report.inserted += await repo.bulk_create(user_id, chunk)
+    return report
+
+
+async def _export_rows(user_id: int, fmt: ExportFormat):
+    async with DatabaseConnection.get_stream_session(user_id) as session:
+        repo = ItemRepository(session)
+        if fmt is ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+
+        async for rows in repo.stream_export(user_id):
+            if fmt is ExportFormat.ndjson:
+                yield "".join(
+                    ndjson.dumps_line({**row._mapping, "tags": row.tags or []})
+                    for row in rows
+                )
+                continue
+
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                writer.writerow([
+                    row.id,
+                    row.title,
+                    row.kind.value,
+                    row.status.value,
+                    row.priority.value,
+                    row.notes,
+                    row.created_at.isoformat(),
+                    row.updated_at.isoformat() if row.updated_at else None,
+                    ";".join(row.tags or []),
+                ])
+            yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_items(
+    user_id: int = Query(...),
+    format: ExportFormat = ExportFormat.ndjson,
+):
+    if format is ExportFormat.csv:
+        media_type = "text/csv"
+    else:
+        media_type = ndjson.MEDIA_TYPE
+    return StreamingResponse(
+        _export_rows(user_id, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="items-{user_id}.{format.value}"',
+        },
+    )
+
+
+@router.patch("/batch", response_model=ItemBatchResult)
+async def batch_update_items(
+    payload: ItemBatchUpdate,
+    session: AsyncSession = Depends(get_db_session, scope="function"),
+    user_id: int = Query(...),
+):
+    repo = ItemRepository(session)
+    changes = payload.changes.model_dump(exclude_none=True)
+    add_tag_ids = changes.pop("add_tag_ids", None)
+    remove_tag_ids = changes.pop("remove_tag_ids", None)
+    affected = await repo.batch_update(
+        payload.ids,
+        user_id,
+        changes,
+        add_tag_ids=add_tag_ids,
+        remove_tag_ids=remove_tag_ids,
+    )
+    return ItemBatchResult(
+        affected=sorted(affected),
+        not_found=sorted(set(payload.ids) - set(affected)),
+    )
+
+
+@router.delete("/batch", response_model=ItemBatchResult)
+async def batch_delete_items(
+    payload: ItemBatchDelete,
+    session: AsyncSession = Depends(get_db_session, scope="function"),
+    user_id: int = Query(...),
+):
+    repo = ItemRepository(session)
+    affected = await repo.batch_delete(payload.ids, user_id)
+    return ItemBatchResult(
+        affected=sorted(affected),
+        not_found=sorted(set(payload.ids) - set(affected)),
+    )
+
+
+@router.get("/search", response_model=list[ItemSearchHit])
+async def search_items(
+    q: str = Query(..., min_length=1),
+    session: AsyncSession = Depends(get_db_user_read_session()),
+    user_id: int = Query(...),
+    limit: int = 20,
+    offset: int = 0,
+):
+    repo = ItemRepository(session)
+    rows = await repo.search(user_id, q, limit=limit, offset=offset)
+    return [
+        ItemSearchHit(
+            item=ItemOut.model_validate(row.Items),
+            rank=row.rank,
+            title_highlight=row.title_highlight,
+            notes_highlight=row.notes_highlight,
+        )
+        for row in rows
+    ]
+
+
+def _item_etag(item_id: int, updated_at) -> str:
+    return make_etag("item", item_id, updated_at.isoformat())
+
+
 @router.get("/{item_id}", response_model=ItemOut)
 async def get_item(
     item_id: int,
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_db_user_read_session()),
     user_id: int = Query(...),
 ):
     repo = ItemRepository(session)
+    conditional = (
+        "if-none-match" in request.headers
+        or "if-modified-since" in request.headers
+    )
+    if conditional:
+        updated_at = await repo.get_updated_at(item_id, user_id)
+        if updated_at is None:
+            raise HTTPException(404, "Item not found")
+        etag = _item_etag(item_id, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
+
     item = await repo.get(item_id, user_id)
     if not item:
         raise HTTPException(404, "Item not found")
+    response.headers.update(
+        validator_headers(_item_etag(item.id, item.updated_at), item.updated_at)
+    )
     return item
 
 
+def _parse_fields(values: list[str] | None) -> list[str] | None:
+    if not values:
+        return None
+    requested = {
+        name.strip()
+        for value in values
+        for name in value.split(",")
+        if name.strip()
+    }
+    unknown = requested - set(ItemFields.__members__)
+    if unknown:
+        raise HTTPException(422, f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Keep the ItemOut field order in the response.
+    return [name for name in ItemFields.__members__ if name in requested]
+
+
 @router.get("/", response_model=list[ItemOut])
 async def list_items(
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    session: AsyncSession = Depends(get_db_user_read_session()),
     user_id: int = Query(...),
     status: StatusEnum | None = None,
     kind: KindEnum | None = None,
     priority: PriorityEnum | None = None,
-    tags: list[int] | None = Query(None),
+    tags: list[int] | None = Query(None, deprecated=True),
+    tags_any: list[int] | None = Query(None),
+    tags_all: list[int] | None = Query(None),
+    tags_none: list[int] | None = Query(None),
     title: str | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
     order_by: ItemSortFields = ItemSortFields.created_at,
     direction: str = "desc",
+    fields: list[str] | None = Query(
+        None, description="Comma separated or repeated ItemOut field names"
+    ),
+    include_total: bool = Query(
+        False, description="Return the number of matching items in X-Total-Count"
+    ),
 ):
-    repo = ItemRepository(session)
-    items = await repo.list(
-        user_id=user_id,
+    selected = _parse_fields(fields)
+    query = dict(
         status=status,
         kind=kind,
         priority=priority,
-        tags_any=tags,
+        tags_any=(tags or []) + (tags_any or []) or None,
+        tags_all=tags_all,
+        tags_none=tags_none,
         title_substring=title,
         limit=limit,
         offset=offset,
+        cursor=cursor,
         sort_by=order_by.value,
         sort_dir=direction,
+        fields=selected,
+    )
+    key = await cache_key(
+        "items", user_scope(user_id), {**query, "include_total": include_total}
     )
-    return items
+    etag = make_etag(key)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    cached = await get_response(key)
+    if cached is not None:
+        return cached
+
+    repo = ItemRepository(session)
+    try:
+        if include_total:
+            items, total, exact = await repo.list_with_total(
+                user_id,
+                exact_limit=settings.app.total_count_exact_limit,
+                **query,
+            )
+        else:
+            items = await repo.list(user_id=user_id, **query)
+    except InvalidCursorError as e:
+        raise HTTPException(400, str(e))
+
+    headers = validator_headers(etag)
+    if include_total:
+        headers["X-Total-Count"] = str(total)
+        if not exact:
+            headers["X-Total-Count-Estimated"] = "true"
+    if items and len(items) == limit:
+        headers["X-Next-Cursor"] = repo.make_cursor(
+            items[-1], order_by.value, direction
+        )
+    if selected is None:
+        body = ITEM_LIST.dump_json(ITEM_LIST.validate_python(items))
+    else:
+        body = PARTIAL_ITEM_LIST.dump_json([
+            {name: item[name] for name in selected} for item in items
+        ])
+    return await set_response(key, body, headers)
 
 
 @router.patch("/{item_id}", response_model=ItemOut)
 async def update_item(
     item_id: int,
     payload: ItemUpdate,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session, scope="function"),
     user_id: int = Query(...),
 ):
-    repo = ItemRepository(session)
-    item = await repo.get(item_id, user_id)
-    if not item:
-        raise HTTPException(404, "Item not found")
-
     item_data = payload.model_dump(exclude_unset=True)
     tag_ids = item_data.pop("tag_ids", None)
-    item = await repo.update(item_id, user_id, item_data, tag_ids=tag_ids)
+    item = await ItemRepository(session).update(
+        item_id, user_id, item_data, tag_ids=tag_ids
+    )
+    if item is None:
+        raise HTTPException(404, "Item not found")
     return item
 
 
 @router.delete("/{item_id}", status_code=204)
 async def delete_item(
     item_id: int,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session, scope="function"),
     user_id: int = Query(...),
 ):
     repo = ItemRepository(session)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from src.core.metrics import CONTENT_TYPE, registry
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
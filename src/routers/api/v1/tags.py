@@ -1,27 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.dependencies import get_db_session
+from src.core.cache import cache_key, get_response, set_response, user_scope
+from src.core.etag import (
+    is_not_modified,
+    make_etag,
+    not_modified,
+    validator_headers,
+)
+from src.database.dependencies import get_db_session, get_db_user_read_session
+from src.database.pagination import InvalidCursorError
 from src.database.repositories import TagRepository
-from src.schemas.tags import TagCreate, TagOut
+from src.schemas.stats import TagCount
+from src.schemas.tags import TagBatchCreate, TagBatchOut, TagCreate, TagOut
 
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
+TAG_LIST = TypeAdapter(list[TagOut])
+TAG_COUNT_LIST = TypeAdapter(list[TagCount])
+
 
 @router.post("/", response_model=TagOut)
 async def create_tag(
     payload: TagCreate,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session, scope="function"),
     user_id: int = 1,
 ):
     repo = TagRepository(session)
     return await repo.create(user_id, payload.name)
 
 
-@router.get("/", response_model=list[TagOut])
+@router.post("/batch", response_model=list[TagBatchOut])
+async def create_tags(
+    payload: TagBatchCreate,
+    session: AsyncSession = Depends(get_db_session, scope="function"),
+    user_id: int = 1,
+):
+    """Get or create tags by name; existing names are returned, not errors."""
+    repo = TagRepository(session)
+    return await repo.upsert_many(user_id, payload.names)
+
+
+@router.get("/", response_model=list[TagCount] | list[TagOut])
 async def list_tags(
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    session: AsyncSession = Depends(get_db_user_read_session(1)),
     user_id: int = 1,
+    prefix: str | None = Query(None, description="Autocomplete on name prefix"),
+    counts: bool = Query(False, description="Include item counts (tag cloud)"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
 ):
+    query = dict(prefix=prefix, counts=counts, limit=limit, cursor=cursor)
+    key = await cache_key("tags", user_scope(user_id), query)
+    etag = make_etag(key)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    cached = await get_response(key)
+    if cached is not None:
+        return cached
+
     repo = TagRepository(session)
-    return await repo.list(user_id)
+    try:
+        tags = await repo.list(user_id, **query)
+    except InvalidCursorError as e:
+        raise HTTPException(400, str(e))
+
+    headers = validator_headers(etag)
+    if len(tags) == limit:
+        headers["X-Next-Cursor"] = repo.make_cursor(tags[-1])
+    adapter = TAG_COUNT_LIST if counts else TAG_LIST
+    body = adapter.dump_json(adapter.validate_python(tags))
+    return await set_response(key, body, headers)
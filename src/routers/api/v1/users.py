@@ -1,8 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.dependencies import get_db_session
-from src.database.repositories import UserRepository
+from src.core import ndjson
+from src.core.cache import USERS_SCOPE, cache_key, user_scope
+from src.core.etag import is_not_modified, make_etag, not_modified
+from src.database.connection import DatabaseConnection
+from src.database.dependencies import (
+    get_db_read_session,
+    get_db_session,
+    get_db_user_read_session,
+)
+from src.database.pagination import InvalidCursorError
+from src.database.models import KindEnum, PriorityEnum, StatusEnum
+from src.database.repositories import StatsRepository, UserRepository
+from src.schemas.stats import TagCount, UserStats
 from src.schemas.users import UserCreate, UserUpdate, UserRead
 
 
@@ -10,20 +24,115 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/", response_model=list[UserRead])
-async def list_users(db: AsyncSession = Depends(get_db_session)):
-    return await UserRepository.get_all(db)
+async def list_users(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_read_session),
+    email_prefix: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+):
+    query = dict(
+        email_prefix=email_prefix,
+        created_from=created_from,
+        created_to=created_to,
+        limit=limit,
+        cursor=cursor,
+    )
+    etag = make_etag(await cache_key("users", USERS_SCOPE, query))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    try:
+        users = await UserRepository.list(db, **query)
+    except InvalidCursorError as e:
+        raise HTTPException(400, str(e))
+    response.headers["ETag"] = etag
+    if len(users) == limit:
+        response.headers["X-Next-Cursor"] = UserRepository.make_cursor(users[-1])
+    return users
+
+
+async def _export_users(filters: dict):
+    async with DatabaseConnection.get_stream_session() as session:
+        async for rows in UserRepository.stream(session, **filters):
+            yield "".join(ndjson.dumps_line(dict(row._mapping)) for row in rows)
+
+
+@router.get("/export")
+async def export_users(
+    email_prefix: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    filters = dict(
+        email_prefix=email_prefix,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        _export_users(filters),
+        media_type=ndjson.MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
 
 
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db_session)):
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_user_read_session()),
+):
+    etag = make_etag(await cache_key("user", user_scope(user_id), {}))
+    # The version counter says nothing about existence, so a wildcard
+    # If-None-Match is only answered once the row has been found.
+    if is_not_modified(request, etag, exists=False):
+        return not_modified(etag)
     user = await UserRepository.get_by_id(db, user_id)
     if not user:
         raise HTTPException(404, "User not found")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return user
 
 
+@router.get("/{user_id}/stats", response_model=UserStats)
+async def get_user_stats(
+    user_id: int,
+    db: AsyncSession = Depends(get_db_user_read_session()),
+):
+    rows = await StatsRepository(db).get(user_id)
+    if not rows and not await UserRepository.get_by_id(db, user_id):
+        raise HTTPException(404, "User not found")
+
+    stats = UserStats(
+        total=0,
+        status={value: 0 for value in StatusEnum},
+        kind={value: 0 for value in KindEnum},
+        priority={value: 0 for value in PriorityEnum},
+        tags=[],
+    )
+    for row in rows:
+        if row.dimension == "total":
+            stats.total = row.count
+        elif row.dimension == "tag":
+            stats.tags.append(
+                TagCount(id=int(row.value), name=row.name or "", count=row.count)
+            )
+        else:
+            getattr(stats, row.dimension)[row.value] = row.count
+    stats.tags.sort(key=lambda tag: (-tag.count, tag.name))
+    return stats
+
+
 @router.post("/", response_model=UserRead, status_code=201)
-async def create_user(data: UserCreate, db: AsyncSession = Depends(get_db_session)):
+async def create_user(
+    data: UserCreate,
+    db: AsyncSession = Depends(get_db_session, scope="function"),
+):
     return await UserRepository.create(db, data)
 
 
@@ -31,7 +140,7 @@ async def create_user(data: UserCreate, db: AsyncSession = Depends(get_db_sessio
 async def update_user(
     user_id: int,
     data: UserUpdate,
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session, scope="function"),
 ):
     user = await UserRepository.get_by_id(db, user_id)
     if not user:
@@ -40,7 +149,10 @@ async def update_user(
 
 
 @router.delete("/{user_id}", status_code=204)
-async def delete_user(user_id: int, db: AsyncSession = Depends(get_db_session)):
+async def delete_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db_session, scope="function"),
+):
     user = await UserRepository.get_by_id(db, user_id)
     if not user:
         raise HTTPException(404, "User not found")
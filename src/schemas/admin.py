@@ -0,0 +1,62 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.core.jobs import JobStatus
+
+
+class SeedParams(BaseModel):
+    users: int = Field(100, ge=1)
+    items_per_user: int = Field(100, ge=0)
+    tags_per_user: int = Field(20, ge=0)
+    tag_fanout: float = Field(1.5, ge=0)
+    skew: float = Field(1.0, ge=0)
+    seed: Optional[int] = None
+    batch_size: int = Field(50_000, ge=1)
+    concurrency: int = Field(4, ge=1, le=16)
+
+
+class SeedResult(BaseModel):
+    users: int
+    tags: int
+    items: int
+    item_tags: int
+    seconds: float
+
+
+class RebuildStatsParams(BaseModel):
+    user_id: Optional[int] = None
+
+
+class JobKind(str, Enum):
+    seed = "seed"
+    rebuild_stats = "rebuild_stats"
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class ProgressOut(BaseModel):
+    done: int
+    total: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    params: dict[str, Any]
+    result: Any = None
+    error: Optional[str] = None
+    progress: Optional[ProgressOut] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
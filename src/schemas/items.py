@@ -2,12 +2,15 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.database.models import Items, KindEnum, PriorityEnum, StatusEnum
 from src.schemas.tags import TagOut
 
 
+BATCH_MAX_ITEMS = 1000
+
+
 class ItemCreate(BaseModel):
     title: str
     kind: KindEnum
@@ -26,6 +29,28 @@ class ItemUpdate(BaseModel):
     tag_ids: Optional[List[int]] = None
 
 
+class ItemBatchChanges(BaseModel):
+    kind: Optional[KindEnum] = None
+    status: Optional[StatusEnum] = None
+    priority: Optional[PriorityEnum] = None
+    add_tag_ids: Optional[List[int]] = None
+    remove_tag_ids: Optional[List[int]] = None
+
+
+class ItemBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    changes: ItemBatchChanges
+
+
+class ItemBatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class ItemBatchResult(BaseModel):
+    affected: List[int]
+    not_found: List[int]
+
+
 class ItemOut(BaseModel):
     id: int
     title: str
@@ -41,7 +66,41 @@ class ItemOut(BaseModel):
         from_attributes = True
 
 
+class ItemImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class ItemImportResult(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ItemImportError] = []
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ItemSearchHit(BaseModel):
+    item: ItemOut
+    rank: float
+    title_highlight: str
+    notes_highlight: Optional[str]
+
+
 ItemSortFields = Enum(
     "ItemSortFields",
-    {col.key: col.key for col in Items.__table__.columns},
+    {
+        col.key: col.key
+        for col in Items.__table__.columns
+        if col.computed is None
+    },
+)
+
+
+# Fields a listing can be narrowed to with ?fields=
+ItemFields = Enum(
+    "ItemFields",
+    {name: name for name in ItemOut.model_fields},
 )
@@ -0,0 +1,19 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from src.database.models import KindEnum, PriorityEnum, StatusEnum
+
+
+class TagCount(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class UserStats(BaseModel):
+    total: int
+    status: Dict[StatusEnum, int]
+    kind: Dict[KindEnum, int]
+    priority: Dict[PriorityEnum, int]
+    tags: List[TagCount]
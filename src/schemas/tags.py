@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import List
+
+from pydantic import BaseModel, Field
 
 
 class TagCreate(BaseModel):
@@ -11,3 +13,11 @@ class TagOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TagBatchCreate(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class TagBatchOut(TagOut):
+    created: bool
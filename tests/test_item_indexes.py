@@ -0,0 +1,164 @@
+"""The planner uses the item list indexes for every list_items shape.
+
+Needs a migrated database (the usual PG*/POSTGRES_* settings); skipped
+otherwise. Rows are seeded, analyzed and explained inside one transaction
+that is rolled back, so the database is left as it was.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+if not os.environ.get("POSTGRES_DB"):
+    pytest.skip("no database configured", allow_module_level=True)
+
+from sqlalchemy import asc, desc, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import settings
+from src.database.models import Items
+from src.database.pagination import Explain
+from src.database.repositories.items import ItemRepository
+
+
+USERS = 50
+ITEMS_PER_USER = 400
+TAGS_PER_USER = 20
+
+# Every item gets the tags whose id is congruent to its own modulo 10, so
+# each tag sits on about a tenth of its user's items.
+SEED = f"""
+WITH new_users AS (
+    INSERT INTO users (email, display_name, created_at)
+    SELECT 'explain-' || n || '@example.com', 'Explain ' || n, now()
+    FROM generate_series(1, {USERS}) n
+    RETURNING id
+), new_tags AS (
+    INSERT INTO tags (user_id, name)
+    SELECT new_users.id, 'tag' || n
+    FROM new_users, generate_series(1, {TAGS_PER_USER}) n
+    RETURNING id, user_id
+), new_items AS (
+    INSERT INTO items (user_id, title, kind, status, priority, created_at, updated_at)
+    SELECT
+        new_users.id,
+        'Title ' || md5(new_users.id || '-' || n),
+        (ARRAY['book', 'article'])[1 + n % 2]::kindenum,
+        (ARRAY['planned', 'reading', 'done'])[1 + n % 3]::statusenum,
+        (ARRAY['low', 'normal', 'high'])[1 + n % 3]::priorityenum,
+        now() - n * interval '1 minute',
+        now() - n * interval '1 minute'
+    FROM new_users, generate_series(1, {ITEMS_PER_USER}) n
+    RETURNING id, user_id
+)
+INSERT INTO item_tag (item_id, tag_id)
+SELECT new_items.id, new_tags.id
+FROM new_items
+JOIN new_tags
+    ON new_tags.user_id = new_items.user_id
+    AND (new_tags.id - new_items.id) % 10 = 0
+"""
+
+# name -> (filters, sort_by, leading index of the plan). The leading index
+# is only pinned where the ordered scan is the one sensible plan; tag
+# filters may be driven from either item_tag index or from items, so they
+# only have to avoid sequential scans.
+SHAPES = {
+    "created_at": ({}, "created_at", "ix_items_user_id_created_at"),
+    "updated_at": ({}, "updated_at", "ix_items_user_id_updated_at"),
+    "priority": ({}, "priority", "ix_items_user_id_priority"),
+    "status": (
+        {"status": "reading"}, "created_at", "ix_items_user_id_status_created_at"
+    ),
+    "tags_any": ({"tags_any": 1}, "created_at", None),
+    "tags_all": ({"tags_all": 2}, "created_at", None),
+    "tags_none": ({"tags_none": 1}, "created_at", None),
+}
+
+TITLE_INDEX = "ix_items_title_trgm"
+
+
+def scans(plan: dict) -> list[tuple[str, str | None, str | None]]:
+    """``(node type, relation, index)`` of every node, outermost first."""
+    nodes = [(plan["Node Type"], plan.get("Relation Name"), plan.get("Index Name"))]
+    for child in plan.get("Plans", ()):
+        nodes += scans(child)
+    return nodes
+
+
+def seq_scanned(nodes) -> set[str]:
+    return {relation for kind, relation, _ in nodes if kind == "Seq Scan"}
+
+
+def leading_index(nodes) -> str | None:
+    return next((index for _, _, index in nodes if index), None)
+
+
+async def explain(session, stmt) -> list:
+    plan = (await session.execute(Explain(stmt))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return scans(plan[0]["Plan"])
+
+
+async def collect_plans() -> dict:
+    """Plan nodes per (shape, order), and for a bare title search."""
+    engine = create_async_engine(settings.database.url)
+    try:
+        async with engine.connect() as conn:
+            await conn.begin()
+            await conn.execute(text(SEED))
+            await conn.execute(text("ANALYZE items"))
+            await conn.execute(text("ANALYZE item_tag"))
+            user_id = (await conn.execute(text(
+                "SELECT id FROM users WHERE email = 'explain-1@example.com'"
+            ))).scalar_one()
+            tag_ids = (await conn.execute(text(
+                "SELECT id FROM tags WHERE user_id = :user_id ORDER BY id"
+            ), {"user_id": user_id})).scalars().all()
+
+            plans = {}
+            for name, (filters, sort_by, _) in SHAPES.items():
+                filters = {
+                    key: tag_ids[:value] if key.startswith("tags_") else value
+                    for key, value in filters.items()
+                }
+                field = getattr(Items, sort_by)
+                for order in (desc, asc):
+                    stmt = (
+                        ItemRepository._filtered(select(Items), user_id, **filters)
+                        .order_by(order(field), order(Items.id))
+                        .limit(20)
+                    )
+                    plans[name, order.__name__] = await explain(conn, stmt)
+
+            plans["title_substring"] = await explain(
+                conn, select(Items).where(Items.title.ilike("%a1b2%"))
+            )
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans():
+    return asyncio.run(collect_plans())
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_list_items_uses_index(plans, shape, order):
+    nodes = plans[shape, order]
+    assert not seq_scanned(nodes) & {"items", "item_tag"}, nodes
+    expected = SHAPES[shape][2]
+    if expected is not None:
+        assert leading_index(nodes) == expected, nodes
+
+
+def test_title_substring_uses_trigram_index(plans):
+    # The migration creates pg_trgm and the index unconditionally, so a
+    # missing index is a failure, not an environment to skip.
+    nodes = plans["title_substring"]
+    assert TITLE_INDEX in {index for _, _, index in nodes}, nodes
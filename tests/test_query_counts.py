@@ -0,0 +1,89 @@
+"""SQL statements per request for the hot item endpoints.
+
+Needs a migrated database (the usual PG*/POSTGRES_* settings); skipped
+otherwise. A throwaway user is created through the API and deleted, with
+everything it owns, afterwards.
+"""
+import os
+import uuid
+
+import pytest
+
+if not os.environ.get("POSTGRES_DB"):
+    pytest.skip("no database configured", allow_module_level=True)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.core.query_stats import capture_query_stats
+from src.database.connection import DatabaseConnection
+from src.main import app
+
+
+async def _delete_user(user_id: int) -> None:
+    async with DatabaseConnection.get_session() as session:
+        await session.execute(
+            text("DELETE FROM users WHERE id = :id"), {"id": user_id}
+        )
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def library(client):
+    user = client.post("/users/", json={
+        "email": f"query-counts-{uuid.uuid4().hex[:8]}@example.com",
+        "display_name": "Query counts",
+    }).json()
+    tag_ids = [
+        client.post(
+            "/tags/", params={"user_id": user["id"]}, json={"name": name}
+        ).json()["id"]
+        for name in ("one", "two", "three")
+    ]
+    item = client.post("/items/", params={"user_id": user["id"]}, json={
+        "title": "Counted",
+        "kind": "book",
+        "status": "planned",
+        "priority": "normal",
+        "tag_ids": tag_ids[:1],
+    }).json()
+    yield user["id"], item["id"], tag_ids
+    client.portal.call(_delete_user, user["id"])
+
+
+def queries(client, method: str, url: str, **kwargs) -> int:
+    with capture_query_stats() as captured:
+        response = client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    (stats,) = captured
+    return stats.queries
+
+
+@pytest.mark.parametrize("payload", [
+    {"priority": "high"},
+    {"tag_ids": [1, 2]},
+    {"status": "done", "tag_ids": [0, 2]},
+], ids=["fields", "tags", "fields_and_tags"])
+def test_update_item(client, library, payload):
+    # One UPDATE with the tag diff, one counter upsert.
+    user_id, item_id, tag_ids = library
+    if "tag_ids" in payload:
+        payload = {**payload, "tag_ids": [tag_ids[i] for i in payload["tag_ids"]]}
+    assert queries(
+        client, "PATCH", f"/items/{item_id}",
+        params={"user_id": user_id}, json=payload,
+    ) <= 2
+
+
+@pytest.mark.parametrize("params", [{}, {"fields": "title,tags"}], ids=["full", "fields"])
+def test_list_items(client, library, params):
+    # The page, then the tags of all its items at once.
+    user_id, _, _ = library
+    assert queries(
+        client, "GET", "/items/", params={"user_id": user_id, **params},
+    ) <= 2